@@ -1,56 +1,137 @@
 from llama_index.core.agent import ReActAgent
 from llama_index.core.tools import ToolMetadata
 from tools import load_model_tool, model_data_tool, model_info_tool, current_model_tool, check_load_model_tool
+from tools import search_library_tool
 from tools import reaction_info_tool, metabolite_info_tool, gene_info_tool
-from tools import run_fba_tool, set_objective_tool, run_fva_tool
-from tools import gene_knockout_tool, reaction_knockout_tool, flux_sampler_tool
-from llama_index.llms.ollama import Ollama
-from llama_index.llms.groq import Groq
+from tools import run_fba_tool, flux_diff_tool, set_objective_tool, run_fva_tool
+from tools import gene_knockout_tool, reaction_knockout_tool, deletion_screen_tool, essential_genes_tool, sweep_tool, screen_tool, flux_sampler_tool
 from llama_index.core.llms import ChatMessage
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.events.llm import LLMChatStartEvent, LLMChatEndEvent
 from prompts import system_prompt, agent_context, llm_system_prompt, llm_prompt
-from llama_index.core.memory import Memory
+from llm_factory import get_llm
+from startup import phase
+from streaming import emit
+from metrics import span, record
 from dotenv import load_dotenv
 import os
 import json
+import threading
+import time
 
 load_dotenv()
 MODEL_NAME = "llama-3.1-8b-instant"
-llm = Groq(model=MODEL_NAME, api_key=os.environ["GROQ_API_KEY"]) # Ollama(model=MODEL_NAME, request_timeout=300)
-memory = Memory.from_defaults(session_id="metabolic_agent", token_limit=40000) # For future integration
+# LLM_PROVIDER=mock (with LLM_MODEL pointing at a transcript/plan) runs the agent fully offline
+PROVIDER = os.environ.get("LLM_PROVIDER", "groq")
+
+# The LLM and the agent are built on first use rather than at import time
+llm = None
+agent = None
+_agent_lock = threading.RLock()  # concurrent first requests must not build two agents
 
 all_tools = [
-    load_model_tool, model_data_tool, model_info_tool, # current_model_tool, check_load_model_tool,
+    load_model_tool, search_library_tool, model_data_tool, model_info_tool, # current_model_tool, check_load_model_tool,
     reaction_info_tool, metabolite_info_tool, gene_info_tool,
-    run_fba_tool, set_objective_tool, run_fva_tool,
-    gene_knockout_tool, reaction_knockout_tool, flux_sampler_tool
+    run_fba_tool, flux_diff_tool, set_objective_tool, run_fva_tool,
+    gene_knockout_tool, reaction_knockout_tool, deletion_screen_tool, essential_genes_tool, sweep_tool, screen_tool, flux_sampler_tool
 ]
 
-agent = ReActAgent.from_tools(
-    tools=all_tools,
-    llm=llm,
-    system_prompt=system_prompt,
-    context=agent_context,
-    verbose=True
-)
+_llm_call_starts = {}
+
+class LLMTimingHandler(BaseEventHandler):
+    """
+    Records every LLM chat call (ReAct steps and the rewrite) as a metrics span.
+    """
+    @classmethod
+    def class_name(cls) -> str:
+        return "LLMTimingHandler"
+
+    def handle(self, event, **kwargs):
+        if isinstance(event, LLMChatStartEvent):
+            _llm_call_starts[event.span_id] = time.perf_counter()
+        elif isinstance(event, LLMChatEndEvent):
+            start = _llm_call_starts.pop(event.span_id, None)
+            if start is not None:
+                record("llm", "chat", time.perf_counter() - start)
+
+get_dispatcher().add_event_handler(LLMTimingHandler())
+
+def default_llm():
+    if PROVIDER == "groq":
+        return get_llm("groq", MODEL_NAME, os.environ["GROQ_API_KEY"]) # Ollama(model=MODEL_NAME, request_timeout=300)
+    return get_llm(PROVIDER, os.environ.get("LLM_MODEL", ""), os.environ.get("LLM_API_KEY"))
+
+def get_agent():
+    global agent, llm
+    if agent is not None:
+        return agent
+    with _agent_lock:
+        if agent is None:
+            if llm is None:
+                llm = default_llm()
+            with phase("agent:build"):
+                agent = ReActAgent.from_tools(
+                    tools=all_tools,
+                    llm=llm,
+                    system_prompt=system_prompt,
+                    context=agent_context,
+                    verbose=True
+                )
+        return agent
 
 def setup_agent(new_llm):
     global agent, llm
-    llm = new_llm
-    agent = ReActAgent.from_tools(
-        tools=all_tools,
-        llm=llm,
-        system_prompt=system_prompt,
-        context=agent_context,
-        verbose=True
-    )
+    with _agent_lock:
+        llm = new_llm
+        agent = None
+        get_agent()
 
-def agent_query(user_input: str):
-    agent_response = agent.query(user_input)
+def rewrite_messages(user_input: str, agent_response):
     final_prompt = llm_prompt.replace("<user_input>", user_input)
     final_prompt = final_prompt.replace("<agentResponse>", str(agent_response))
-    messages = [
+    return [
         ChatMessage(role="system", content=llm_system_prompt),
         ChatMessage(role="user", content=final_prompt.strip())
     ]
-    response = llm.chat(messages)
-    return str(response.message.content)
\ No newline at end of file
+
+def agent_query(user_input: str):
+    with span("agent", "react_loop"):
+        agent_response = get_agent().query(user_input)
+    with span("agent", "rewrite"):
+        response = llm.chat(rewrite_messages(user_input, agent_response))
+    return str(response.message.content)
+
+def agent_query_events(user_input: str):
+    """
+    Streaming variant of `agent_query`: runs the ReAct loop step by step and emits
+    agent steps, tool events (from the tools themselves) and rewrite tokens as they happen.
+    """
+    runner = get_agent()
+    emit("agent_start", message=user_input)
+    runner.memory.set([])  # same fresh-history semantics as `query`
+    task = runner.create_task(user_input)
+    seen, step_no = 0, 0
+    while True:
+        step_no += 1
+        emit("agent_step_start", step=step_no)
+        start = time.perf_counter()
+        step_output = runner.run_step(task.task_id)
+        reasoning = task.extra_state.get("current_reasoning", [])
+        for reasoning_step in reasoning[seen:]:
+            emit("agent_step", step=step_no, kind=type(reasoning_step).__name__, content=reasoning_step.get_content())
+        seen = len(reasoning)
+        emit("agent_step_end", step=step_no, seconds=round(time.perf_counter() - start, 4))
+        if step_output.is_last:
+            break
+    agent_response = runner.finalize_response(task.task_id, step_output)
+    emit("agent_response", content=str(agent_response))
+
+    start = time.perf_counter()
+    text = ""
+    for chunk in llm.stream_chat(rewrite_messages(user_input, agent_response)):
+        delta = chunk.delta or ""
+        if delta:
+            text += delta
+            emit("token", delta=delta)
+    emit("done", response=text, rewrite_seconds=round(time.perf_counter() - start, 4))
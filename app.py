@@ -1,7 +1,15 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import json
+import time
 
 API_BASE = "http://localhost:8000"
+PAGE_SIZE = 50
+CHAT_WINDOW = 20  # messages rendered on every rerun; older ones on request
+PARSE_TIMEOUT = 300  # seconds to wait for an uploaded model to finish parsing
 
 st.set_page_config(page_title="Metabolic Model Assistant", layout="wide")
 st.markdown(
@@ -26,6 +34,95 @@ if "disclaimer" not in st.session_state:
     st.session_state.disclaimer = False
 if "llm" not in st.session_state:
     st.session_state.llm = False
+if "uploads" not in st.session_state:
+    st.session_state.uploads = {}  # CSV file hash -> filename
+
+@st.cache_resource
+def get_session():
+    """
+    One keep-alive connection pool to the backend for every rerun and user of this app.
+    """
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.2, allowed_methods=["GET"], status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+http = get_session()
+
+def file_hash(uploaded):
+    return hashlib.sha256(uploaded.getvalue()).hexdigest()
+
+def model_revision(model_id):
+    """
+    The backend's revision of a model; caches below are keyed by it, so they refresh after any change.
+    """
+    res = http.get(f"{API_BASE}/model_status/{model_id}", timeout=10)
+    return res.json().get("revision") if res.status_code == 200 else None
+
+def checked(res, model_id, revision):
+    """
+    The response body, if it describes this model at this revision; errors are not cached.
+    """
+    res.raise_for_status()
+    data = res.json()
+    if (data.get("model_id"), data.get("revision")) != (model_id, revision):
+        raise requests.RequestException(f"Model {model_id} changed while it was being read; try again.")
+    return data
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def fetch_stats(model_id, revision):
+    res = http.get(f"{API_BASE}/get_stats/", params={"model_id": model_id}, timeout=30)
+    return checked(res, model_id, revision)["stats"]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def fetch_page(model_id, revision, kind, offset, limit=PAGE_SIZE):
+    res = http.get(f"{API_BASE}/list/{kind}", params={"model_id": model_id, "offset": offset, "limit": limit},
+                   timeout=30)
+    return checked(res, model_id, revision)
+
+def iter_sse(response):
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
+
+def stream_chat(message):
+    status = st.status("Thinking...", expanded=False)
+    placeholder = st.empty()
+    text = ""
+    with http.post(f"{API_BASE}/chat/stream/", json={"message": message}, stream=True, timeout=600) as res:
+        if res.status_code != 200:
+            return f"⚠️ Error: {res.text}"
+        for event, data in iter_sse(res):
+            if event == "agent_step_start":
+                status.update(label=f"Reasoning (step {data['step']})...")
+            elif event == "agent_step":
+                status.write(data["content"])
+            elif event == "tool_start":
+                status.update(label=f"Running {data['tool']}...")
+            elif event == "tool_end":
+                mark = "✅" if data["ok"] else "⚠️"
+                status.write(f"{mark} `{data['tool']}` finished in {data['seconds']:.2f}s")
+            elif event == "agent_response":
+                status.update(label="Writing answer...")
+            elif event == "token":
+                text += data["delta"]
+                placeholder.markdown(text + "▌")
+            elif event == "done":
+                text = data["response"]
+                status.update(label=f"Done in {data['time']:.2f}s", state="complete")
+            elif event == "error":
+                status.update(label="Failed", state="error")
+                text = f"⚠️ Error: {data['detail']}"
+    placeholder.markdown(text)
+    return text
 
 @st.dialog("DISCLAIMER!")
 def popup():
@@ -59,7 +156,7 @@ else:
                 payload = {"provider": provider, "model": model}
                 if provider != "ollama":
                     payload["api_key"] = api_key
-                res = requests.post(f"{API_BASE}/set_llm/", json=payload)
+                res = http.post(f"{API_BASE}/set_llm/", json=payload)
                 if res.status_code == 200:
                     st.success(f"LLM switched to {provider}: {model}")
                     st.session_state.llm = True
@@ -71,56 +168,89 @@ else:
 
         csv_file = st.file_uploader("Upload your CSV file", type=["csv"])
         if csv_file and st.button("Upload CSV to Backend"):
-            files = {"file": (csv_file.name, csv_file.getvalue(), "text/csv")}
-            res = requests.post(f"{API_BASE}/upload_csv/", files=files)
-            if res.status_code == 200 and res.json().get("status") == "success":
-                st.success(f"CSV uploaded: {res.json()['filename']}")
+            digest = file_hash(csv_file)
+            if st.session_state.uploads.get(digest) == csv_file.name:
+                st.success(f"CSV already uploaded: {csv_file.name}")
             else:
-                st.error(f"Upload failed: {res.json().get('detail')}")
+                files = {"file": (csv_file.name, csv_file.getvalue(), "text/csv")}
+                res = http.post(f"{API_BASE}/upload_csv/", files=files)
+                if res.status_code == 200 and res.json().get("status") == "success":
+                    st.session_state.uploads[digest] = csv_file.name
+                    st.success(f"CSV uploaded: {res.json()['filename']}")
+                else:
+                    st.error(f"Upload failed: {res.json().get('detail')}")
 
-        uploaded_file = st.file_uploader("Upload SBML (.xml) file", type=["xml"])
+        uploaded_file = st.file_uploader("Upload SBML (.xml, .sbml, .gz) file", type=["xml", "sbml", "gz"])
         if uploaded_file and st.button("Upload Model", key="upload_btn"):
-            files = {"file": uploaded_file}
-            res = requests.post(f"{API_BASE}/upload_model/", files=files)
+            # always posted: the backend skips parsing for a file it already holds and makes it current
+            files = {"file": (uploaded_file.name, uploaded_file)}
+            res = http.post(f"{API_BASE}/upload_model/", files=files)
             if res.status_code == 200:
-                st.session_state.model_id = res.json()["model_id"]
-                st.success(f"Model ID: {st.session_state.model_id}")
+                status = res.json()
+                deadline = time.monotonic() + PARSE_TIMEOUT
+                with st.spinner("Parsing model..."):
+                    while status["status"] == "parsing":
+                        if time.monotonic() > deadline:
+                            status = {**status, "status": "error", "detail": f"still parsing after {PARSE_TIMEOUT}s"}
+                            break
+                        time.sleep(0.5)
+                        poll = http.get(f"{API_BASE}/model_status/{status['model_id']}", timeout=10)
+                        if poll.status_code != 200:
+                            status = {**status, "status": "error", "detail": poll.json().get("detail")}
+                            break
+                        status = poll.json()
+                if status["status"] == "error":
+                    st.error(f"Invalid SBML file: {status.get('detail')}")
+                else:
+                    st.session_state.model_id = status["model_id"]
+                    st.success(f"Model ID: {st.session_state.model_id}")
             else:
                 st.error(f"Upload failed: {res.json().get('detail')}")
 
         if st.session_state.model_id:
+            revision = model_revision(st.session_state.model_id)
             if st.button("📊 Get Model Stats", key="stats_btn"):
-                res = requests.get(f"{API_BASE}/get_stats/")
-                if res.status_code == 200:
-                    st.info(res.json()["stats"])
-                else:
+                try:
+                    st.info(fetch_stats(st.session_state.model_id, revision))
+                except requests.RequestException:
                     st.error("Failed to retrieve model stats")
 
+            with st.expander("🔎 Browse model"):
+                kind = st.selectbox("Show", ["reactions", "metabolites", "genes"], key="browse_kind")
+                page = st.number_input("Page", min_value=1, value=1, step=1, key="browse_page")
+                try:
+                    data = fetch_page(st.session_state.model_id, revision, kind, (page - 1) * PAGE_SIZE)
+                    st.caption(f"{data['offset'] + 1}-{data['offset'] + len(data['items'])} of {data['total']}")
+                    st.dataframe(data["items"], use_container_width=True, hide_index=True)
+                except requests.RequestException:
+                    st.error(f"Failed to retrieve {kind}")
+
     st.header("💬 Agentic Chat")
 
     if st.session_state.llm:
         chat_container = st.container()
         user_input = st.chat_input("Ask about the model...")
 
-        if user_input:
-            st.session_state.chat_history.append(("user", user_input))
-            try:
-                res = requests.post(f"{API_BASE}/chat/", json={"message": user_input})
-                if res.status_code == 200:
-                    response_text = res.json()["response"]  # ["raw"]["message"]["content"] # Here if OpenAI then chnage accordingly
-                    st.session_state.chat_history.append(("agent", response_text))
-                else:
-                    error_msg = res.json().get("detail", "Unknown error")
-                    st.session_state.chat_history.append(("agent", f"⚠️ Error: {error_msg}"))
-            except Exception as e:
-                st.session_state.chat_history.append(("agent", f"⚠️ Exception: {str(e)}"))
-
         with chat_container:
-            for role, msg in st.session_state.chat_history:
+            history = st.session_state.chat_history
+            if len(history) > CHAT_WINDOW and not st.toggle(f"Show {len(history) - CHAT_WINDOW} earlier messages"):
+                history = history[-CHAT_WINDOW:]
+            for role, msg in history:
                 if role == "user":
                     st.chat_message("user").write(msg)
                 else:
                     st.chat_message("assistant").write(msg)
+
+            if user_input:
+                st.session_state.chat_history.append(("user", user_input))
+                st.chat_message("user").write(user_input)
+                with st.chat_message("assistant"):
+                    try:
+                        response_text = stream_chat(user_input)
+                    except Exception as e:
+                        response_text = f"⚠️ Exception: {str(e)}"
+                        st.write(response_text)
+                st.session_state.chat_history.append(("agent", response_text))
     else:
         st.warning("Please configure the LLM in the sidebar to start chatting.")
         st.info("Supported providers: groq, ollama, openai, Hugging Face")
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+Benchmark suite for the analysis tools in tools.py.
+
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --models e_coli_core synthetic:2000 --solvers glpk --quick
+
+Every function in tools.py (lookups, FBA, FVA, single/double knockouts, sampling) is timed against
+uploads/e_coli_core.xml and synthetic genome-scale models, once per backend: each installed LP
+solver and the solver pool ("pool"), forced through the solver policy. Each run is appended to
+benchmarks/history.jsonl and compared with the previous run of the same case.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import psutil
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# time the analyses themselves, not results the background precomputation cached
+os.environ.setdefault("PRECOMPUTE", "0")
+
+import cobra
+import pandas as pd
+from cobra.io import write_sbml_model
+from optlang import available_solvers
+
+import tools
+from models import ModelManager
+from solver_policy import ANALYSES, size_class
+from benchmarks.synthetic import synthetic_model, synthetic_bounds
+
+HISTORY = ROOT / "benchmarks" / "history.jsonl"
+LP_SOLVERS = ("glpk", "highs", "cplex", "gurobi", "mosek")
+
+
+class PeakRSS:
+    """
+    Samples the RSS of this process and its children (solver worker pools) while a case runs.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _rss(self):
+        proc = psutil.Process()
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = self._rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+        self.peak_mb = self.peak / 1e6
+
+
+def installed_solvers():
+    return [s for s in LP_SOLVERS if available_solvers.get(s.upper())] + ["pool"]
+
+
+def force_backend(manager, model, backend):
+    """
+    Makes the solver policy pick `backend` for every analysis it can run (FBA never runs on the
+    pool; it then stays on the model's own solver).
+    """
+    manager.policy.profile = {analysis: {size_class(model): {backend: 0.0}} for analysis in ANALYSES}
+
+
+def prepare_model(spec, workdir):
+    """
+    Returns (sbml_path, bounds_data) for 'e_coli_core' or 'synthetic:<n_reactions>'.
+    """
+    if spec == "e_coli_core":
+        bounds = pd.read_csv(ROOT / "uploads" / "bounds_data" / "e_coli_bounds.csv").values.tolist()
+        return ROOT / "uploads" / "e_coli_core.xml", bounds
+    if spec.startswith("synthetic:"):
+        model = synthetic_model(int(spec.split(":")[1]))
+        path = Path(workdir) / f"{model.id}.xml"
+        write_sbml_model(model, str(path))
+        return path, synthetic_bounds(model)
+    raise ValueError(f"Unknown model spec: {spec}")
+
+
+def build_cases(model, quick, screen_dir):
+    """
+    (name, callable, repeats) for every tool function, sized to the model. `screen_dir` holds
+    copies of the model for the directory screen.
+    """
+    n = 5 if quick else 20
+    reactions = [r for r in model.reactions if r.name and not r.id.startswith("EX_")]
+    step = max(1, len(reactions) // n)
+    rxn_names = [r.name for r in reactions[::step]][:n]
+    genes = [g.name for g in model.genes if g.name]
+    gene_names = genes[::max(1, len(genes) // n)][:n]
+    mid_rxn = reactions[len(reactions) // 2]
+    metabolite = model.metabolites[len(model.metabolites) // 2]
+    gene = model.genes[len(model.genes) // 2]
+    objective = {r.id: 1.0 for r in model.reactions if r.objective_coefficient}
+    uptakes = [r for r in model.reactions if r.boundary and r.lower_bound < 0][:2]
+    steps = 11 if quick else 41
+    lookups = 10 if quick else 50
+
+    return [
+        ("model_data", lambda: tools.model_data(), lookups),
+        ("model_info", lambda: tools.model_info("reactions", 100), lookups),
+        ("reaction_info", lambda: tools.reaction_info(mid_rxn.name), lookups),
+        ("metabolite_info", lambda: tools.metabolite_info(metabolite.id), lookups),
+        ("gene_info", lambda: tools.gene_info(gene.id), lookups),
+        ("search_model_library", lambda: tools.search_model_library(model.id or "coli", 10), lookups),
+        ("set_model_objective", lambda: tools.set_model_objective(objective, "max"), lookups // 2),
+        ("run_fba", lambda: tools.run_fba(), 5 if quick else 20),
+        ("run_pfba", lambda: tools.run_fba(pfba=True), 1 if quick else 5),
+        ("compare_flux_runs", lambda: tools.compare_flux_runs(), lookups),  # the FBA and pFBA runs above
+        ("run_fva", lambda: tools.run_fva(rxn_names, 0.9), 1 if quick else 3),
+        ("gene_knockout_single", lambda: tools.gene_knockout_simulation(gene_names, "single"), 1 if quick else 3),
+        ("gene_knockout_double", lambda: tools.gene_knockout_simulation(gene_names[:6], "double"), 1),
+        ("find_essential_genes", lambda: tools.find_essential_genes(), 1),
+        ("reaction_knockout_single", lambda: tools.reaction_knockout_simulation(rxn_names, "single"), 1 if quick else 3),
+        ("reaction_knockout_double", lambda: tools.reaction_knockout_simulation(rxn_names[:6], "double"), 1),
+        ("reaction_deletion_screen", lambda: tools.reaction_deletion_screen(), 1),
+        ("parametric_sweep", lambda: tools.parametric_sweep(
+            [r.id for r in uptakes], [2 * r.lower_bound for r in uptakes], [0.0] * len(uptakes), steps), 1),
+        ("screen_models", lambda: tools.screen_models(str(screen_dir), "fba"), 1),
+        ("sample_metabolic_model", lambda: tools.sample_metabolic_model(20 if quick else 100), 1),
+    ]
+
+
+def time_case(fn, repeats, warmup):
+    if warmup:
+        fn()
+    latencies, errors = [], 0
+    with PeakRSS() as rss:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = fn()
+            latencies.append(time.perf_counter() - start)
+            if isinstance(result, dict) and "error" in result:
+                errors += 1
+    lat = np.array(latencies)
+    return {
+        "repeats": repeats,
+        "errors": errors,
+        "throughput_per_s": round(repeats / lat.sum(), 3) if lat.sum() > 0 else None,
+        "p50_ms": round(float(np.percentile(lat, 50)) * 1e3, 3),
+        "p95_ms": round(float(np.percentile(lat, 95)) * 1e3, 3),
+        "p99_ms": round(float(np.percentile(lat, 99)) * 1e3, 3),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+
+def run_suite(model_specs, solvers, quick=False, only=None):
+    results = []
+    workdir = tempfile.mkdtemp(prefix="cobra_bench_")
+    # tools write their CSV outputs relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    for sub in ("fva", "knockouts", "flux_sampling"):
+        os.makedirs(os.path.join("outputs", sub), exist_ok=True)
+    try:
+        for spec in model_specs:
+            sbml_path, bounds = prepare_model(spec, workdir)
+            for solver in solvers:
+                manager = ModelManager()
+                tools.set_model_manager(manager)
+                if manager.solver_pool is not None:
+                    manager.solver_pool.warm()  # worker start-up is a one-off server cost, not per analysis
+                start = time.perf_counter()
+                with PeakRSS() as rss:
+                    manager.load_sbml(sbml_path)
+                load_s = time.perf_counter() - start
+                model = manager.get_current_model()
+                manager.library.add_file(sbml_path, prefetch=False)  # something for the library search to find
+                screen_dir = manager.library.root / "screen" / spec.replace(":", "_")
+                screen_dir.mkdir(parents=True, exist_ok=True)
+                for copy in ("a", "b"):
+                    shutil.copyfile(sbml_path, screen_dir / f"{copy}.xml")
+                if solver != "pool":
+                    model.solver = solver
+                force_backend(manager, model, solver)
+                manager.bounds_data = bounds
+                base = {"model": spec, "solver": solver, "reactions": len(model.reactions)}
+                results.append({**base, "case": "load_sbml", "repeats": 1, "errors": 0,
+                                "throughput_per_s": round(1 / load_s, 3), "p50_ms": round(load_s * 1e3, 3),
+                                "p95_ms": round(load_s * 1e3, 3), "p99_ms": round(load_s * 1e3, 3),
+                                "peak_rss_mb": round(rss.peak_mb, 1)})
+                print(f"{spec:<18} {solver:<6} {'load_sbml':<26} p50 {load_s * 1e3:10.2f} ms")
+                for name, fn, repeats in build_cases(model, quick, screen_dir):
+                    if only and name not in only:
+                        continue
+                    stats = time_case(fn, repeats, warmup=repeats > 1)
+                    results.append({**base, "case": name, **stats})
+                    print(f"{spec:<18} {solver:<6} {name:<26} p50 {stats['p50_ms']:10.2f} ms  "
+                          f"p95 {stats['p95_ms']:10.2f} ms  {stats['throughput_per_s']} ops/s  "
+                          f"{stats['peak_rss_mb']} MB" + (f"  {stats['errors']} errors" if stats["errors"] else ""))
+                if manager.solver_pool is not None:
+                    manager.solver_pool.shutdown()
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def git_revision():
+    try:
+        rev = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet"], cwd=ROOT) != 0
+        return rev + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def load_history(path):
+    if not Path(path).exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(results, history, threshold):
+    """
+    Compares p50 latency with the most recent earlier run of the same (model, solver, case).
+    """
+    previous = {}
+    for run in history:
+        for r in run["results"]:
+            previous[(r["model"], r["solver"], r["case"])] = (run["commit"], r)
+    regressions = []
+    for r in results:
+        key = (r["model"], r["solver"], r["case"])
+        if key not in previous:
+            continue
+        commit, old = previous[key]
+        if old["p50_ms"] <= 0:
+            continue
+        change = r["p50_ms"] / old["p50_ms"] - 1
+        if change > threshold:
+            regressions.append((key, commit, old["p50_ms"], r["p50_ms"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=["e_coli_core", "synthetic:1000", "synthetic:5000"])
+    parser.add_argument("--solvers", nargs="+", default=None,
+                        help="Backends: LP solvers or 'pool' (default: all installed and the pool)")
+    parser.add_argument("--cases", nargs="+", default=None, help="Only run these cases")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and smaller inputs")
+    parser.add_argument("--processes", type=int, default=None, help="cobra worker processes for FVA/knockouts")
+    parser.add_argument("--history", default=str(HISTORY))
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown reported as a regression")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    if args.processes:
+        cobra.Configuration().processes = args.processes
+    solvers = args.solvers or installed_solvers()
+    history = load_history(args.history)
+    results = run_suite(args.models, solvers, quick=args.quick, only=args.cases)
+
+    run = {
+        "commit": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "cobra": cobra.__version__,
+                 "cpus": psutil.cpu_count(), "ram_gb": round(psutil.virtual_memory().total / 1e9, 1)},
+        "quick": args.quick,
+        "results": results,
+    }
+    for (model, solver, case), commit, old, new, change in compare(results, history, args.threshold):
+        print(f"REGRESSION {model} {solver} {case}: p50 {old:.2f} ms ({commit}) -> {new:.2f} ms ({change:+.0%})")
+    if not args.no_save:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Saved to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Load-testing harness for the FastAPI backend.
+
+    python benchmarks/load_test.py --profile mixed --concurrency 1 4 16 64
+    python benchmarks/load_test.py --target spawn --workers 2 --profile polling
+    python benchmarks/load_test.py --target http://localhost:8000 --profile chat
+    python benchmarks/load_test.py --compare benchmarks/reports/a.json benchmarks/reports/b.json
+
+The app is driven in-process (ASGI transport), through a uvicorn server started by the harness
+(`spawn`) or at an existing URL. Chat traffic uses the offline `mock` LLM with the routes in
+Testing/mock_plans/load_test.json, so no network access or API key is needed. For every
+concurrency level the report lists throughput, p50/p95/p99 latency, error rate and server RSS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import psutil
+
+ROOT = Path(__file__).resolve().parent.parent
+REPORTS = ROOT / "benchmarks" / "reports"
+MODEL_FILE = ROOT / "uploads" / "e_coli_core.xml"
+BOUNDS_FILE = ROOT / "uploads" / "bounds_data" / "e_coli_bounds.csv"
+MOCK_PLAN = ROOT / "Testing" / "mock_plans" / "load_test.json"
+
+# request kind -> weight
+PROFILES = {
+    "polling": {"stats": 0.9, "chat": 0.1},
+    "chat": {"chat": 0.8, "stats": 0.2},
+    "mixed": {"upload": 0.05, "stats": 0.45, "chat": 0.35, "analysis": 0.15},
+    "analysis": {"analysis": 0.7, "stats": 0.3},
+    "uploads": {"upload": 0.6, "stats": 0.4},
+}
+CHAT_MESSAGES = ["#metadata Give the metadata of the model", "#reaction Describe glucose-6-phosphate isomerase",
+                 "#fba Run flux balance analysis"]
+ANALYSIS_MESSAGES = ["#fva Run flux variability analysis", "#knockout Run double gene knockouts",
+                     "#sampling Sample the model"]
+
+
+class Target:
+    """
+    Owns the HTTP client and knows how to measure the server's memory.
+    """
+    def __init__(self, kind, workers=1, port=8765):
+        self.kind = kind
+        self.workers = workers
+        self.port = port
+        self.server = None
+        self.workdir = tempfile.mkdtemp(prefix="cobra_load_")
+        for sub in ("uploads/bounds_data", "outputs/fva", "outputs/knockouts", "outputs/flux_sampling"):
+            os.makedirs(os.path.join(self.workdir, sub), exist_ok=True)
+
+    def _env(self):
+        env = dict(os.environ)
+        env.update({"LLM_PROVIDER": "mock", "LLM_MODEL": str(MOCK_PLAN)})
+        return env
+
+    async def __aenter__(self):
+        if self.kind == "inprocess":
+            os.environ.update(self._env())
+            os.chdir(self.workdir)  # uploads/outputs are written relative to the working directory
+            sys.path.insert(0, str(ROOT))
+            import main
+            transport = httpx.ASGITransport(app=main.app)
+            self.client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=600)
+            self.process = psutil.Process()
+        elif self.kind == "spawn":
+            self.server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(ROOT),
+                 "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+                cwd=self.workdir, env=self._env(),
+            )
+            self.process = psutil.Process(self.server.pid)
+            self.client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.port}", timeout=600)
+            await self._wait_ready()
+        else:
+            self.client = httpx.AsyncClient(base_url=self.kind, timeout=600)
+            self.process = None
+        return self
+
+    async def _wait_ready(self, timeout=120):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await self.client.get("/startup_report/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+        raise RuntimeError("Server did not start in time.")
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        if self.server:
+            self.server.terminate()
+            self.server.wait(timeout=30)
+
+    def rss_mb(self):
+        if self.process is None:
+            return None
+        total = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1e6
+
+
+async def setup(client):
+    """
+    Uploads the model and bounds and switches the backend to the mock LLM.
+    """
+    with open(MODEL_FILE, "rb") as f:
+        (await client.post("/upload_model/", params={"wait": True}, files={"file": (MODEL_FILE.name, f.read())})).raise_for_status()
+    with open(BOUNDS_FILE, "rb") as f:
+        (await client.post("/upload_csv/", files={"file": (BOUNDS_FILE.name, f.read())})).raise_for_status()
+    (await client.post("/set_llm/", json={"provider": "mock", "model": str(MOCK_PLAN)})).raise_for_status()
+
+
+async def send(client, kind, rng, model_bytes):
+    if kind == "stats":
+        return await client.get("/get_stats/")
+    if kind == "upload":
+        return await client.post("/upload_model/", files={"file": (MODEL_FILE.name, model_bytes)})
+    if kind == "chat":
+        return await client.post("/chat/", json={"message": rng.choice(CHAT_MESSAGES)})
+    if kind == "analysis":
+        return await client.post("/chat/", json={"message": rng.choice(ANALYSIS_MESSAGES)})
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+async def run_level(target, profile, concurrency, duration, seed):
+    kinds, weights = zip(*PROFILES[profile].items())
+    model_bytes = MODEL_FILE.read_bytes()
+    samples = []  # (kind, latency_s, ok)
+    rss = []
+    stop_at = time.monotonic() + duration
+
+    async def worker(i):
+        rng = random.Random(seed * 1000 + i)
+        while time.monotonic() < stop_at:
+            kind = rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            try:
+                res = await send(target.client, kind, rng, model_bytes)
+                ok = res.status_code < 400 and "error" not in res.text[:200].lower()
+            except httpx.HTTPError:
+                ok = False
+            samples.append((kind, time.perf_counter() - start, ok))
+
+    async def monitor():
+        while time.monotonic() < stop_at:
+            value = target.rss_mb()
+            if value is not None:
+                rss.append(value)
+            await asyncio.sleep(0.25)
+
+    start = time.perf_counter()
+    await asyncio.gather(monitor(), *(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(samples, elapsed, concurrency, rss)
+
+
+def latency_stats(latencies):
+    lat = np.array(latencies) * 1e3
+    return {
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+    }
+
+
+def summarize(samples, elapsed, concurrency, rss):
+    result = {"concurrency": concurrency, "requests": len(samples), "seconds": round(elapsed, 2)}
+    if not samples:
+        return result
+    result["throughput_rps"] = round(len(samples) / elapsed, 2)
+    result["error_rate"] = round(sum(not ok for _, _, ok in samples) / len(samples), 4)
+    result.update(latency_stats([lat for _, lat, _ in samples]))
+    if rss:
+        result["server_rss_mb_mean"] = round(float(np.mean(rss)), 1)
+        result["server_rss_mb_peak"] = round(float(np.max(rss)), 1)
+    result["by_kind"] = {}
+    for kind in sorted({k for k, _, _ in samples}):
+        kind_samples = [(lat, ok) for k, lat, ok in samples if k == kind]
+        result["by_kind"][kind] = {
+            "requests": len(kind_samples),
+            "error_rate": round(sum(not ok for _, ok in kind_samples) / len(kind_samples), 4),
+            **latency_stats([lat for lat, _ in kind_samples]),
+        }
+    return result
+
+
+def print_level(r):
+    print(f"c={r['concurrency']:<4} {r['requests']:>6} req  {r.get('throughput_rps', 0):>8} rps  "
+          f"p50 {r.get('p50_ms', 0):>9} ms  p95 {r.get('p95_ms', 0):>9} ms  p99 {r.get('p99_ms', 0):>9} ms  "
+          f"err {r.get('error_rate', 0):.2%}  rss {r.get('server_rss_mb_peak', '-')} MB")
+
+
+def compare_reports(paths):
+    reports = [json.loads(Path(p).read_text()) for p in paths]
+    print(f"{'concurrency':<12}" + "".join(f"{Path(p).stem[:28]:>30}" for p in paths))
+    levels = sorted({lvl["concurrency"] for r in reports for lvl in r["levels"]})
+    for c in levels:
+        cells = []
+        for r in reports:
+            lvl = next((x for x in r["levels"] if x["concurrency"] == c), None)
+            cells.append(f"{lvl['throughput_rps']} rps / p95 {lvl['p95_ms']} ms" if lvl and "p95_ms" in lvl else "-")
+        print(f"{c:<12}" + "".join(f"{cell:>30}" for cell in cells))
+
+
+async def main_async(args):
+    target_kind = args.target
+    async with Target(target_kind, workers=args.workers, port=args.port) as target:
+        await setup(target.client)
+        levels = []
+        for concurrency in args.concurrency:
+            result = await run_level(target, args.profile, concurrency, args.duration, args.seed)
+            print_level(result)
+            levels.append(result)
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="inprocess", help="'inprocess', 'spawn' or a base URL")
+    parser.add_argument("--profile", default="mixed", choices=sorted(PROFILES))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Report path (default: benchmarks/reports/)")
+    parser.add_argument("--compare", nargs="+", default=None, help="Compare saved reports instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(args.compare)
+        return
+
+    levels = asyncio.run(main_async(args))
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.target,
+        "workers": args.workers,
+        "profile": args.profile,
+        "weights": PROFILES[args.profile],
+        "duration_s": args.duration,
+        "cpus": psutil.cpu_count(),
+        "levels": levels,
+    }
+    output = Path(args.output) if args.output else REPORTS / f"load_{args.profile}_{args.target if args.target in ('inprocess', 'spawn') else 'url'}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
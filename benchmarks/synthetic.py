@@ -0,0 +1,67 @@
+"""
+Synthetic genome-scale metabolic models of controlled size for benchmarking.
+
+A feasible backbone (uptake -> linear pathway -> biomass) guarantees a non-zero optimum;
+random reactions with gene-reaction rules are then added until the requested size is reached.
+"""
+import numpy as np
+from cobra import Model, Reaction, Metabolite
+
+
+def synthetic_model(n_reactions=2000, n_genes=None, seed=0):
+    rng = np.random.default_rng(seed)
+    n_metabolites = max(10, int(n_reactions * 0.7))
+    n_genes = n_genes or max(5, int(n_reactions * 0.6))
+    n_exchanges = max(3, n_metabolites // 20)
+    backbone = min(50, n_metabolites - 1)
+
+    model = Model(f"synthetic_{n_reactions}")
+    mets = [Metabolite(f"m{i}_c", name=f"metabolite {i}", compartment="c") for i in range(n_metabolites)]
+    genes = [f"g{i}" for i in range(n_genes)]
+    reactions = []
+
+    uptake = Reaction("EX_m0_e", name="m0 exchange", lower_bound=-10.0, upper_bound=1000.0)
+    uptake.add_metabolites({mets[0]: -1.0})
+    reactions.append(uptake)
+    for i in range(backbone):
+        rxn = Reaction(f"R_bb{i}", name=f"backbone reaction {i}", lower_bound=0.0, upper_bound=1000.0)
+        rxn.add_metabolites({mets[i]: -1.0, mets[i + 1]: 1.0})
+        rxn.gene_reaction_rule = genes[i % n_genes]
+        reactions.append(rxn)
+
+    exchange_mets = rng.choice(np.arange(1, n_metabolites), size=n_exchanges, replace=False)
+    for i in exchange_mets:
+        rxn = Reaction(f"EX_m{i}_e", name=f"m{i} exchange", lower_bound=-5.0 * rng.random(), upper_bound=1000.0)
+        rxn.add_metabolites({mets[i]: -1.0})
+        reactions.append(rxn)
+
+    n_random = n_reactions - len(reactions) - 1
+    for j in range(max(0, n_random)):
+        size = rng.integers(2, 5)
+        idx = rng.choice(n_metabolites, size=size, replace=False)
+        coeffs = rng.choice([1.0, 2.0], size=size) * np.where(np.arange(size) < size // 2, -1.0, 1.0)
+        reversible = rng.random() < 0.4
+        rxn = Reaction(f"R{j}", name=f"reaction {j}", lower_bound=-1000.0 if reversible else 0.0, upper_bound=1000.0)
+        rxn.add_metabolites({mets[k]: float(c) for k, c in zip(idx, coeffs)})
+        rxn.subsystem = f"subsystem {j % 25}"
+        g = rng.choice(n_genes, size=rng.integers(1, 3), replace=False)
+        joiner = " and " if rng.random() < 0.5 else " or "
+        rxn.gene_reaction_rule = joiner.join(genes[k] for k in g)
+        reactions.append(rxn)
+
+    biomass = Reaction("BIOMASS", name="biomass", lower_bound=0.0, upper_bound=1000.0)
+    biomass.add_metabolites({mets[backbone]: -1.0})
+    reactions.append(biomass)
+
+    model.add_reactions(reactions)
+    model.objective = "BIOMASS"
+    for gene in model.genes:
+        gene.name = gene.id
+    return model
+
+
+def synthetic_bounds(model):
+    """
+    Uptake bounds in the `bounds_data` format ([reaction, lval, uval] rows) used by `run_fba`.
+    """
+    return [[rxn.id, rxn.lower_bound, rxn.upper_bound] for rxn in model.reactions if rxn.id.startswith("EX_")]
@@ -0,0 +1,191 @@
+"""
+Reduced models for heavy analyses (FVA, knockouts, sampling).
+
+Blocked reactions are removed, reactions coupled through a metabolite that only they use are
+merged into one (their fluxes are in a fixed ratio), and metabolites left without reactions are
+dropped. Every original reaction maps to a kept reaction and a factor
+(v_original = factor * v_kept), or to zero flux when blocked, so results can be mapped back.
+"""
+from collections import deque
+from cobra import Model, Reaction, Metabolite
+from cobra.flux_analysis import find_blocked_reactions
+import numpy as np
+import pandas as pd
+
+from solver_pool import knocked_reactions
+
+ZERO = 1e-9
+
+
+def find_blocked(model, pool=None, key=None, processes=None):
+    """
+    Ids of the reactions that cannot carry flux under the current bounds.
+    """
+    if pool is None:
+        return set(find_blocked_reactions(model, processes=processes))
+    return pool.blocked(key, model, ZERO)
+
+
+def _merged_bounds(lb1, ub1, lb2, ub2, k):
+    """
+    Bounds on v1 once v2 = k * v1 also has to respect [lb2, ub2].
+    """
+    lo, hi = sorted((lb2 / k, ub2 / k))
+    return max(lb1, lo), min(ub1, hi)
+
+
+class Compression:
+    def __init__(self, model, revision, blocked, key):
+        self.revision = revision
+        self.key = key
+        self.blocked = set(blocked)
+        reactions = list(model.reactions)
+        met_index = {met.id: i for i, met in enumerate(model.metabolites)}
+        alive = [j for j, rxn in enumerate(reactions) if rxn.id not in self.blocked]
+
+        cols = {j: {met_index[m.id]: c for m, c in reactions[j].metabolites.items()} for j in alive}
+        users = {}
+        for j, col in cols.items():
+            for i in col:
+                users.setdefault(i, set()).add(j)
+        lb = {j: reactions[j].lower_bound for j in alive}
+        ub = {j: reactions[j].upper_bound for j in alive}
+        members = {j: {j: 1.0} for j in alive}
+        rules = {j: [reactions[j].gene_reaction_rule] for j in alive}
+
+        queue = deque(i for i, js in users.items() if len(js) == 2)
+        while queue:
+            i = queue.popleft()
+            if len(users.get(i, ())) != 2:
+                continue
+            j1, j2 = sorted(users[i])
+            k = -cols[j1][i] / cols[j2][i]
+            lo, hi = _merged_bounds(lb[j1], ub[j1], lb[j2], ub[j2], k)
+            if lo > hi + ZERO:
+                continue
+            merged = dict(cols[j1])
+            for m, c in cols[j2].items():
+                merged[m] = merged.get(m, 0.0) + k * c
+            merged = {m: c for m, c in merged.items() if abs(c) > ZERO}
+            for m in set(cols[j1]) | set(cols[j2]):
+                users[m].discard(j1)
+                users[m].discard(j2)
+                if m in merged:
+                    users[m].add(j1)
+                if len(users[m]) == 2:
+                    queue.append(m)
+            cols[j1] = merged
+            lb[j1], ub[j1] = lo, max(lo, hi)
+            for orig, factor in members.pop(j2).items():
+                members[j1][orig] = k * factor
+            rules[j1] += rules.pop(j2)
+            del cols[j2], lb[j2], ub[j2]
+
+        self.members = {reactions[j].id: {reactions[o].id: f for o, f in ms.items()} for j, ms in members.items()}
+        self.kept = {orig: (kept, factor) for kept, ms in self.members.items() for orig, factor in ms.items()}
+        self.model = self._build(model, reactions, cols, lb, ub, rules)
+        self.index = {rxn.id: j for j, rxn in enumerate(self.model.reactions)}
+        self.update_objective(model)
+        self.stats = {
+            "reactions": [len(reactions), len(self.model.reactions)],
+            "metabolites": [len(model.metabolites), len(self.model.metabolites)],
+            "blocked_reactions": len(self.blocked),
+            "merged_reactions": len(alive) - len(self.model.reactions),
+        }
+
+    @staticmethod
+    def _build(model, reactions, cols, lb, ub, rules):
+        compressed = Model(f"{model.id}_compressed")
+        metabolites = list(model.metabolites)
+        used = {}
+        new_reactions = []
+        for j in sorted(cols):
+            original = reactions[j]
+            rxn = Reaction(original.id, name=original.name, subsystem=original.subsystem,
+                           lower_bound=lb[j], upper_bound=ub[j])
+            for i in cols[j]:
+                if i not in used:
+                    met = metabolites[i]
+                    used[i] = Metabolite(met.id, formula=met.formula, name=met.name, compartment=met.compartment)
+            rxn.add_metabolites({used[i]: c for i, c in cols[j].items()})
+            rule = [r for r in rules[j] if r]
+            rxn.gene_reaction_rule = rule[0] if len(rule) == 1 else " and ".join(f"({r})" for r in rule)
+            new_reactions.append(rxn)
+        compressed.add_reactions(new_reactions)
+        return compressed
+
+    def update_objective(self, model):
+        """
+        Carries the original objective over (used when only the objective changed).
+        """
+        coefficients = {rxn.id: rxn.objective_coefficient for rxn in model.reactions if rxn.objective_coefficient}
+        objective = {}
+        for kept, ms in self.members.items():
+            c = sum(coefficients.get(orig, 0.0) * factor for orig, factor in ms.items())
+            if c:
+                objective[self.model.reactions.get_by_id(kept)] = c
+        self.model.objective = objective
+        self.model.objective_direction = model.objective_direction
+
+    def reactions_for(self, reactions):
+        """
+        The kept reactions behind a list of original reactions (blocked ones need no solve).
+        """
+        ids = dict.fromkeys(self.kept[r.id][0] for r in reactions if r.id in self.kept)
+        return [self.model.reactions.get_by_id(i) for i in ids]
+
+    def expand_fva(self, result, reaction_ids):
+        """
+        Maps an FVA table of kept reactions back to the original reaction ids.
+        """
+        rows = []
+        for rxn_id in reaction_ids:
+            if rxn_id not in self.kept:
+                rows.append((0.0, 0.0))
+                continue
+            kept, factor = self.kept[rxn_id]
+            lo, hi = result.at[kept, "minimum"] * factor, result.at[kept, "maximum"] * factor
+            rows.append((min(lo, hi), max(lo, hi)))
+        return pd.DataFrame(rows, index=list(reaction_ids), columns=["minimum", "maximum"])
+
+    def _indices(self, reaction_ids):
+        return sorted({self.index[self.kept[r][0]] for r in reaction_ids if r in self.kept})
+
+    def reaction_knockouts(self, reaction_sets):
+        """
+        Kept-reaction indices to knock out for each set of original reactions; knocking out any
+        member of a merged chain knocks out the whole chain, and blocked reactions change nothing.
+        """
+        return [self._indices(r.id for r in rxns) for rxns in reaction_sets]
+
+    def gene_knockouts(self, gene_sets):
+        """
+        Same for sets of genes of the original model, using its gene-reaction rules.
+        """
+        return [self._indices(knocked_reactions(genes)) for genes in gene_sets]
+
+    def expand_samples(self, samples, reaction_ids):
+        """
+        Maps flux samples of the reduced model back to every original reaction (blocked ones are zero).
+        """
+        values = samples.to_numpy()
+        columns = {rxn_id: i for i, rxn_id in enumerate(samples.columns)}
+        expanded = np.zeros((len(samples), len(reaction_ids)))
+        for j, rxn_id in enumerate(reaction_ids):
+            if rxn_id in self.kept:
+                kept, factor = self.kept[rxn_id]
+                expanded[:, j] = values[:, columns[kept]] * factor
+        return pd.DataFrame(expanded, columns=list(reaction_ids), index=samples.index)
+
+
+def compress(model, revision, key, pool=None, pool_key=None, processes=None):
+    """
+    Reduces `model` at the given revision. Returns None for an infeasible model. Without a pool the
+    solves run through cobra with `processes` worker processes (cobra's default when None).
+    """
+    if pool is not None:
+        if pool.optimize(pool_key, model)[1] != "optimal":
+            return None
+    elif model.slim_optimize(error_value=None) is None:
+        return None
+    return Compression(model, revision, find_blocked(model, pool, pool_key, processes), key)
@@ -0,0 +1,108 @@
+"""
+Single-reaction deletion screens over all reactions, a subsystem or a list.
+
+Reactions without flux in the reference optimum are not solved: the reference solution stays
+feasible without them, so the objective cannot change. The rest are knocked out as bound masks on
+the solver pool's resident problems, in parallel (on the reduced model when compression is on,
+where all reactions of a merged chain share one LP). Results come back as one table ranked by the
+growth left, plus a short summary.
+"""
+import numpy as np
+import pandas as pd
+
+from solver_policy import deletion_with_deadline, solver_timeout
+
+ZERO = 1e-9
+REDUCED = 0.99  # relative growth below which a deletion counts as reducing growth
+TOP = 10
+
+
+def reference_solution(manager, model_id, deadline):
+    """
+    Objective value and fluxes of the reference optimum (precomputed when current).
+    """
+    precomputed = manager.precompute.get("fba", model_id)
+    if precomputed and precomputed["status"] == "optimal":
+        return precomputed["objective_value"], precomputed["fluxes"]
+    model = manager.models[model_id]
+    with solver_timeout(model, deadline):
+        solution = model.optimize(raise_error=False)
+    if solution.status != "optimal":
+        raise ValueError(f"The model is {solution.status}; a deletion screen needs an optimal reference solution.")
+    return solution.objective_value, solution.fluxes
+
+
+def _pool_knockouts(manager, model_id, reaction_ids, deadline):
+    model = manager.models[model_id]
+    pool = manager.pool_for(model)
+    compressed = manager.get_compressed(model_id)
+    if compressed:
+        knockouts = [tuple(k) for k in compressed.reaction_knockouts([[model.reactions.get_by_id(r)] for r in reaction_ids])]
+        unique = list(dict.fromkeys(knockouts))
+        results = dict(zip(unique, pool.knockouts(compressed.key, compressed.model, unique, deadline.at)))
+        return [results[k] for k in knockouts], len(unique)
+    index = manager.get_summary(model_id).positions["reactions"]
+    return pool.knockouts(model_id, model, [[index[r]] for r in reaction_ids], deadline.at), len(reaction_ids)
+
+
+def _cobra_knockouts(model, reaction_ids, deadline):
+    table = deletion_with_deadline(model, [model.reactions.get_by_id(r) for r in reaction_ids], "reaction",
+                                   "single", deadline)
+    rows = {next(iter(ids)): (growth, status) for ids, growth, status in zip(table["ids"], table["growth"], table["status"])}
+    return [rows[r] for r in reaction_ids], len(reaction_ids)
+
+
+def screen_reactions(manager, model_id, positions, deadline, backend="pool", target=None, threshold=0.01):
+    """
+    Deletes each reaction at `positions` (summary order) on its own. Returns the ranked table and a
+    summary; `target` is the model to use when the backend is not the pool.
+    """
+    summary = manager.get_summary(model_id)
+    reference, fluxes = reference_solution(manager, model_id, deadline)
+    ids = summary.ids["reactions"][positions]
+    flux = fluxes.reindex(ids).to_numpy(dtype=np.float64, na_value=0.0)
+    active = np.abs(flux) > ZERO
+    growth = np.full(len(ids), reference, dtype=np.float64)
+    status = np.full(len(ids), "optimal", dtype=object)
+    lps = 0
+    if active.any():
+        if backend == "pool":
+            rows, lps = _pool_knockouts(manager, model_id, list(ids[active]), deadline)
+        else:
+            rows, lps = _cobra_knockouts(target, list(ids[active]), deadline)
+        growth[active] = [g for g, _ in rows]
+        status[active] = [s for _, s in rows]
+
+    unfinished = status == "time_limit"
+    growth = np.where(np.isnan(growth) & ~unfinished, 0.0, growth)  # no solution: no growth
+    growth[np.abs(growth) < ZERO] = 0.0
+    relative = growth / reference if reference else np.full(len(ids), np.nan)
+    table = pd.DataFrame({
+        "reaction": ids,
+        "name": summary.names["reactions"][positions],
+        "subsystem": summary.subsystems[positions],
+        "reference_flux": flux,
+        "growth": growth,
+        "relative_growth": relative,
+        "status": status,
+        "solved": active,
+        "essential": ~unfinished & (relative < threshold),
+    })
+    table = table.sort_values(["relative_growth", "reaction"], na_position="last", kind="stable").reset_index(drop=True)
+
+    reduced = ~table["essential"] & (table["relative_growth"] < REDUCED)
+    result = {
+        "reference_growth": reference,
+        "tested": len(table),
+        "skipped_zero_flux": int((~active).sum()),
+        "lps": int(lps),
+        "essential": int(table["essential"].sum()),
+        "reduced_growth": int(reduced.sum()),
+        "no_effect": int((table["relative_growth"] >= REDUCED).sum()),
+        "unfinished": int(unfinished.sum()),
+        "top": table.head(TOP)[["reaction", "name", "subsystem", "relative_growth", "status"]].to_dict(orient="records"),
+    }
+    by_subsystem = table[table["essential"]].groupby("subsystem").size().sort_values(ascending=False)
+    if len(by_subsystem) > 1:
+        result["essential_by_subsystem"] = by_subsystem.head(TOP).to_dict()
+    return table, result
@@ -0,0 +1,123 @@
+"""
+Every FBA/pFBA flux vector, kept per model as one row of a float32 matrix.
+
+Runs are keyed by the model revision and a scenario fingerprint (a hash of all flux bounds and
+the objective), so re-solving an unchanged scenario reuses its row. Diffs between two runs are
+one vector subtraction plus an argpartition for the top-k changes.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+MAX_RUNS = int(os.environ.get("FLUX_STORE_RUNS", 500))
+RTOL = ATOL = 1e-6  # float32 keeps ~7 significant digits; smaller differences are rounding
+
+
+def scenario_fingerprint(summary):
+    """
+    Hash of the flux bounds and objective of a model summary.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(summary.lower_bounds.tobytes())
+    h.update(summary.upper_bounds.tobytes())
+    h.update(f"{summary.objective}|{summary.objective_direction}".encode())
+    return h.hexdigest()
+
+
+class FluxRuns:
+    """
+    The stored runs of one model (reaction order fixed at load time).
+    """
+    def __init__(self, reaction_ids, reaction_names):
+        self.reaction_ids = np.asarray(reaction_ids, dtype=object)
+        self.reaction_names = np.asarray(reaction_names, dtype=object)
+        self.fluxes = np.zeros((8, len(reaction_ids)), dtype=np.float32)
+        self.runs = []   # metadata, one dict per row
+        self.keys = {}   # (revision, fingerprint, method) -> run id
+        self.next_id = 1
+
+    def add(self, fluxes, **meta):
+        key = (meta["revision"], meta["fingerprint"], meta["method"])
+        if key in self.keys:
+            return self.get(self.keys[key])
+        if len(self.runs) == MAX_RUNS:
+            oldest = self.runs.pop(0)
+            self.keys.pop((oldest["revision"], oldest["fingerprint"], oldest["method"]), None)
+            self.fluxes[:-1] = self.fluxes[1:]
+        elif len(self.runs) == len(self.fluxes):
+            self.fluxes = np.vstack([self.fluxes, np.zeros_like(self.fluxes)])[:MAX_RUNS]
+        run = {"run_id": self.next_id, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+        self.fluxes[len(self.runs)] = fluxes
+        self.runs.append(run)
+        self.keys[key] = run["run_id"]
+        self.next_id += 1
+        return run
+
+    def row(self, run_id):
+        for i, run in enumerate(self.runs):
+            if run["run_id"] == run_id:
+                return i
+        raise KeyError(f"Run {run_id} is not stored (it may have been evicted).")
+
+    def get(self, run_id):
+        return self.runs[self.row(run_id)]
+
+    def vector(self, run_id):
+        return self.fluxes[self.row(run_id)]
+
+
+class FluxStore:
+    def __init__(self):
+        self.models = {}  # model_id -> FluxRuns
+        self._lock = threading.Lock()
+
+    def clear(self, model_id):
+        with self._lock:
+            self.models.pop(model_id, None)
+
+    def add(self, model_id, summary, fluxes, method, objective_value, status):
+        """
+        Stores a solution's flux vector (a pandas Series indexed by reaction id) and returns its run.
+        """
+        with self._lock:
+            runs = self.models.get(model_id)
+            if runs is None:
+                runs = self.models[model_id] = FluxRuns(summary.ids["reactions"], summary.names["reactions"])
+            vector = fluxes.reindex(runs.reaction_ids).to_numpy(dtype=np.float32, na_value=np.nan)
+            return runs.add(vector, revision=summary.revision, fingerprint=scenario_fingerprint(summary),
+                            method=method, objective_value=float(objective_value), status=status)
+
+    def runs(self, model_id):
+        runs = self.models.get(model_id)
+        return list(runs.runs) if runs else []
+
+    def diff(self, model_id, run_a=None, run_b=None, top_k=10):
+        """
+        The top-k reactions whose flux changed most from run_a to run_b (default: the last two runs).
+        """
+        with self._lock:
+            runs = self.models.get(model_id)
+            if runs is None or ((run_a is None or run_b is None) and len(runs.runs) < 2):
+                raise ValueError("At least two stored runs are needed; run FBA under two conditions first.")
+            run_a = run_a or runs.runs[-2]["run_id"]
+            run_b = run_b or runs.runs[-1]["run_id"]
+            a, b = runs.vector(run_a).copy(), runs.vector(run_b).copy()
+            meta = (runs.get(run_a), runs.get(run_b))
+        delta = np.nan_to_num(b - a)
+        magnitude = np.abs(delta)
+        magnitude[np.isclose(a, b, rtol=RTOL, atol=ATOL)] = 0.0
+        changed = int(np.count_nonzero(magnitude))
+        k = min(top_k, changed)
+        top = np.argpartition(-magnitude, k - 1)[:k] if k else np.zeros(0, dtype=int)
+        top = top[np.argsort(-magnitude[top])]
+        return {
+            "run_a": meta[0],
+            "run_b": meta[1],
+            "changed_reactions": changed,
+            "total_absolute_change": float(magnitude.sum()),
+            "top": [{"reaction": runs.reaction_ids[j], "name": runs.reaction_names[j],
+                     "flux_a": float(a[j]), "flux_b": float(b[j]), "change": float(delta[j])} for j in top],
+        }
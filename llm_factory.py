@@ -1,16 +1,38 @@
-from llama_index.llms.openai import OpenAI
-from llama_index.llms.ollama import Ollama
-from llama_index.llms.groq import Groq
-from llama_index.llms.huggingface import HuggingFaceLLM
+from startup import phase
+import os
 
+# Providers are imported on first selection so that unused backends (e.g. torch via HuggingFace) never load
 def get_llm(provider: str, model: str, api_key: str = None):
     if provider == "ollama":
-        return Ollama(model=model, request_timeout=300)
+        with phase("provider:ollama"):
+            from llama_index.llms.ollama import Ollama
+        llm = Ollama(model=model, request_timeout=300)
     elif provider == "openai":
-        return OpenAI(model=model, api_key=api_key)
+        with phase("provider:openai"):
+            from llama_index.llms.openai import OpenAI
+        llm = OpenAI(model=model, api_key=api_key)
     elif provider == "hf-local":
-        return HuggingFaceLLM(model_name=model)
+        with phase("provider:hf-local"):
+            from llama_index.llms.huggingface import HuggingFaceLLM
+        llm = HuggingFaceLLM(model_name=model)
     elif provider == "groq":
-        return Groq(model=model, api_key=api_key)
+        with phase("provider:groq"):
+            from llama_index.llms.groq import Groq
+        llm = Groq(model=model, api_key=api_key)
+    elif provider in ("mock", "replay"):
+        from mock_llm import ReplayLLM
+        # `model` is the path to a recorded transcript or scripted plan (JSON); empty uses a default plan
+        return ReplayLLM.from_file(
+            model or None,
+            latency=float(os.environ.get("MOCK_LLM_LATENCY", 0.0)),
+            token_latency=float(os.environ.get("MOCK_LLM_TOKEN_LATENCY", 0.0)),
+            recorded_latency=os.environ.get("MOCK_LLM_RECORDED_LATENCY", "0") == "1",
+        )
     else:
-        raise ValueError(f"Unsupported LLM provider: {provider}")
\ No newline at end of file
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+    record_path = os.environ.get("LLM_RECORD_PATH")
+    if record_path:
+        from mock_llm import RecordingLLM
+        return RecordingLLM(llm=llm, path=record_path)
+    return llm
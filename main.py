@@ -1,16 +1,31 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
+from startup import phase, startup_report, print_startup_report
+with phase("import:fastapi"):
+    from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+    from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel
+with phase("import:cobra+models"):
+    from models import ModelManager, SBML_SUFFIXES
+    from model_summary import KINDS
+with phase("import:tools"):
+    from tools import set_model_manager
+with phase("import:agent"):
+    from agent import agent_query, agent_query_events, setup_agent
+from streaming import stream_events, emit
+from screening import ANALYSES, check_directory, run_screen
+from model_library import UPLOAD_DIR
+from metrics import collect, record, inc, render_prometheus
 from llm_factory import get_llm
-from pydantic import BaseModel
-from agent import agent_query, setup_agent
-from models import ModelManager
 from pathlib import Path
-from tools import set_model_manager
 import pandas as pd
+import asyncio
+import hashlib
+import threading
+import time
 import os
 
-UPLOAD_DIR = Path("uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH"}
 UPLOAD_DIR.mkdir(exist_ok=True)
 os.makedirs("outputs", exist_ok=True)
 os.makedirs("/outputs/flux_sampling/", exist_ok=True)
@@ -18,6 +33,11 @@ os.makedirs("/outputs/knockouts/", exist_ok=True)
 os.makedirs("/outputs/fva/", exist_ok=True)
 model_manager = ModelManager()
 set_model_manager(model_manager)
+if model_manager.solver_pool is not None:
+    # start the solver workers in the background so the first analysis doesn't pay for it
+    threading.Thread(target=model_manager.solver_pool.warm, daemon=True).start()
+if os.environ.get("STARTUP_REPORT", "0") == "1":
+    print_startup_report()
 
 app = FastAPI()
 app.add_middleware(
@@ -28,6 +48,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def time_endpoints(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # the route template, never the raw path, so clients can't create new series
+    path = route.path if route else "unmatched"
+    method = request.method if request.method in HTTP_METHODS else "OTHER"
+    record("endpoint", f"{method} {path}", time.perf_counter() - start)
+    inc("cobra_http_requests_total", path=path, status=response.status_code)
+    return response
+
 current_llm_config = {
     "provider": "groq",
     "model": "llama-3.1-8b-instant",
@@ -42,26 +75,55 @@ class LLMConfig(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    timings: bool = False
+
+
+class ScreenRequest(BaseModel):
+    directory: str = None
+    analysis: str = "fba"
+    threshold: float = 0.01
+    use_bounds: bool = True
 
 
 @app.post("/upload_model/")
-async def upload_model(file: UploadFile = File(...)):
-    if not file.filename.endswith(('.xml', '.sbml')):
-        raise HTTPException(status_code=400, detail="Invalid file format. Please upload an SBML file (.xml or .sbml)")
+async def upload_model(file: UploadFile = File(...), wait: bool = False):
+    if not file.filename.lower().endswith(SBML_SUFFIXES):
+        raise HTTPException(status_code=400, detail="Invalid file format. Please upload an SBML file (.xml, .sbml, .xml.gz or .sbml.gz)")
     try:
-        file_path = UPLOAD_DIR / file.filename
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        model_id = model_manager.load_sbml(file_path)
+        # Stream the upload to disk in chunks while hashing, instead of holding it in memory
+        file_path = UPLOAD_DIR / Path(file.filename).name
+        part_path = file_path.with_name(file_path.name + ".part")
+        digest = hashlib.sha256()
+        with open(part_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
         await file.close()
-        return {"status": "success", "model_id": model_id}    
+        os.replace(part_path, file_path)
+
+        status, future = model_manager.submit_sbml(file_path, digest.hexdigest())
+        if wait and future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception as e:
+                # the parser raises CobraSBMLError and friends, not ValueError; it's still a bad file
+                raise ValueError(str(e)) from e
+            status = model_manager.get_load_status(status["model_id"])
+        return {**status, "status": "success" if status["status"] == "ready" else status["status"]}
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=f"Invalid SBML file: {str(ve)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
+@app.get("/model_status/{model_id}")
+async def model_status(model_id: str):
+    status = model_manager.get_load_status(model_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown model ID: {model_id}")
+    return status
+
+
 @app.post("/upload_csv/")
 async def upload_csv(file: UploadFile = File(...)):
     try:
@@ -80,29 +142,67 @@ async def upload_csv(file: UploadFile = File(...)):
 
 
 @app.get("/get_stats/")
-async def get_stats():
-    try:
-        model = model_manager.get_current_model()
-        model_id = str(model.id)
-        objective_reaction = str(model.objective.expression) if model.objective.expression else "Not Set Yet"
-        reactions_count = len(model.reactions)
-        metabolites_count = len(model.metabolites)
-        genes_count = len(model.genes)
-
-        stats = f"""
-        Model ID: {model_id}\n
-        Objective Reaction: {objective_reaction}\n
-        Reactions Count: {reactions_count}\n
-        Metabolites Count: {metabolites_count}\n
-        Genes Count: {genes_count}\n
-        Groups Count": {len(model.groups)}\n
-        Compartments Count": {len(model.compartments)}\n
-        Compartments: {str([v for k,v in model.compartments.items()])}\n
-        """
-
-        return {"stats": stats, "status_code": 200}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_stats(model_id: str = None):
+    summary = model_manager.get_summary(model_id)
+    if summary is None:
+        raise HTTPException(status_code=500, detail=f"Unknown model ID: {model_id}" if model_id else "No model is currently loaded.")
+    return {"stats": summary.stats, "model_id": summary.model_id, "revision": summary.revision, "status_code": 200}
+
+
+@app.get("/list/{kind}")
+async def list_items(kind: str, offset: int = 0, limit: int = 50, model_id: str = None):
+    summary = model_manager.get_summary(model_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Unknown model ID: {model_id}" if model_id else "No model is currently loaded.")
+    if kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}'. Use one of {', '.join(KINDS)}.")
+    return {
+        "model_id": summary.model_id,
+        "revision": summary.revision,
+        "total": len(summary.ids[kind]),
+        "offset": offset,
+        "items": summary.page(kind, offset, min(limit, 1000), field="all"),
+    }
+
+
+@app.get("/model_structure/")
+async def model_structure():
+    summary = model_manager.get_summary()
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No model is currently loaded.")
+    return {"model_id": summary.model_id, "revision": summary.revision, "shape": list(summary.S.shape),
+            "nonzeros": int(summary.S.nnz), "degrees": summary.degrees}
+
+
+@app.get("/flux_runs/")
+async def flux_runs(model_id: str = None):
+    model_id = model_id or model_manager.current_model_id
+    return {"model_id": model_id, "runs": model_manager.fluxes.runs(model_id)}
+
+
+@app.get("/library/search")
+async def library_search(q: str = "", limit: int = 20):
+    return {"models": model_manager.library.search(q, limit)}
+
+
+@app.get("/precompute/")
+async def precompute_status():
+    return {"enabled": model_manager.precompute.enabled, "models": model_manager.precompute.status()}
+
+
+@app.post("/precompute/cancel")
+async def precompute_cancel(model_id: str = None):
+    return {"cancelled": model_manager.precompute.cancel(model_id)}
+
+
+@app.get("/startup_report/")
+async def get_startup_report():
+    return startup_report()
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/set_llm/")
@@ -120,12 +220,51 @@ def set_llm(config: LLMConfig):
 @app.post("/chat/")
 async def chat(req: ChatRequest):
     try:
-        response = agent_query(req.message)
+        with collect() as timings, model_manager.precompute.interactive():
+            response = agent_query(req.message)
+        if req.timings:
+            return {"response": response, "timings": timings}
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _screen_events(req):
+    directory = check_directory(req.directory or model_manager.library.models_dir,
+                                (model_manager.library.root, UPLOAD_DIR))
+    if req.analysis not in ANALYSES:
+        raise ValueError(f"Unknown analysis: {req.analysis}. Choose one of {', '.join(ANALYSES)}.")
+    bounds = model_manager.bounds_data if req.use_bounds else None
+    summary = run_screen(directory, req.analysis, bounds, threshold=req.threshold)
+    emit("done", **{k: v for k, v in summary.items() if k != "results"})
+
+
+@app.post("/screen/")
+def screen_models(req: ScreenRequest):
+    """
+    Streams one `screen_model` event per finished model; the full table is written to CSV.
+    """
+    return StreamingResponse(
+        stream_events(_screen_events, req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _interactive_query_events(message):
+    with model_manager.precompute.interactive():
+        agent_query_events(message)
+
+
+@app.post("/chat/stream/")
+def chat_stream(req: ChatRequest):
+    return StreamingResponse(
+        stream_events(_interactive_query_events, req.message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # if __name__ == "__main__":
 #     model_manager.load_sbml("uploads/e_coli_core.xml")
 #     message = "Set the objective of the model to {ATPM: 1.0, EX_o2_e: 2.0} with direction as min"
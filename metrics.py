@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+import functools
+import threading
+import time
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_lock = threading.Lock()
+_local = threading.local()
+_histograms = {}  # (metric, labels) -> [bucket counts..., sum, count]
+_counters = {}    # (metric, labels) -> value
+_help = {
+    "cobra_span_seconds": ("histogram", "Duration of traced spans (tools, solver calls, LLM calls, endpoints, I/O)."),
+    "cobra_lp_solves_total": ("counter", "Linear programs solved, by span."),
+    "cobra_bytes_written_total": ("counter", "Bytes written to result files, by span."),
+    "cobra_http_requests_total": ("counter", "HTTP requests served, by path and status code."),
+}
+
+
+def _labels(**labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(metric, value, **labels):
+    key = (metric, _labels(**labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+def inc(metric, value=1, **labels):
+    key = (metric, _labels(**labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record(kind, name, seconds, lp_count=0, bytes_written=0, **extra):
+    """
+    Records a finished span: histogram, counters and the per-request breakdown (if one is being collected).
+    """
+    observe("cobra_span_seconds", seconds, kind=kind, name=name)
+    if lp_count:
+        inc("cobra_lp_solves_total", lp_count, kind=kind, name=name)
+    if bytes_written:
+        inc("cobra_bytes_written_total", bytes_written, kind=kind, name=name)
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        entry = {"kind": kind, "name": name, "seconds": round(seconds, 4)}
+        if lp_count:
+            entry["lp_count"] = lp_count
+        if bytes_written:
+            entry["bytes_written"] = bytes_written
+        entry.update(extra)
+        timings.append(entry)
+
+
+@contextmanager
+def span(kind, name, **extra):
+    """
+    Times a block. The yielded dict can be filled with `lp_count`, `bytes_written` or other details.
+    """
+    info = dict(extra)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        record(kind, name, time.perf_counter() - start, **info)
+
+
+def traced(kind):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect():
+    """
+    Collects every span recorded by the current thread into a list (the per-request timing breakdown).
+    """
+    previous = getattr(_local, "timings", None)
+    _local.timings = []
+    try:
+        yield _local.timings
+    finally:
+        _local.timings = previous
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """
+    Renders all metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+    for metric, (metric_type, help_text) in _help.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        if metric_type == "histogram":
+            for (name, labels), hist in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                for bound, value in zip(BUCKETS, hist):
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {value}")
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist[-1]}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {hist[-2]:.6f}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {hist[-1]}")
+        else:
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
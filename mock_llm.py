@@ -0,0 +1,221 @@
+import json
+import threading
+import time
+from typing import Any, Sequence
+from pydantic import PrivateAttr
+from llama_index.core.llms import (
+    CustomLLM, ChatMessage, ChatResponse, ChatResponseGen,
+    CompletionResponse, CompletionResponseGen, LLMMetadata
+)
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+
+DEFAULT_PLAN = [
+    {"tool": "model_data", "args": {}},
+    {"text": "The model metadata was retrieved successfully."},
+]
+
+
+def plan_to_responses(plan):
+    """
+    Renders a scripted tool-call plan into the raw ReAct text the agent expects.
+    Steps are {"tool": name, "args": {...}}, {"answer": text} or {"text": text}.
+    """
+    responses = []
+    for step in plan:
+        if "tool" in step:
+            responses.append({
+                "response": (
+                    f"Thought: I need to use a tool to help me answer the question.\n"
+                    f"Action: {step['tool']}\n"
+                    f"Action Input: {json.dumps(step.get('args', {}))}"
+                ),
+                "latency": step.get("latency", 0.0),
+            })
+        elif "answer" in step:
+            responses.append({
+                "response": f"Thought: I can answer without using any more tools.\nAnswer: {step['answer']}",
+                "latency": step.get("latency", 0.0),
+            })
+        else:
+            responses.append({"response": step["text"], "latency": step.get("latency", 0.0)})
+    return responses
+
+
+def load_transcript(path):
+    """
+    Reads a recorded transcript or a scripted plan from a JSON file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return parse_transcript(data)
+
+
+def parse_transcript(data):
+    if isinstance(data, dict) and "plan" in data:
+        return plan_to_responses(data["plan"])
+    if isinstance(data, dict):
+        data = data.get("responses", [])
+    return [r if isinstance(r, dict) else {"response": str(r), "latency": 0.0} for r in data]
+
+
+class ReplayLLM(CustomLLM):
+    """
+    Offline LLM that replays recorded responses (or a scripted tool-call plan) in order,
+    with a configurable synthetic latency per call and per streamed token.
+    """
+    responses: list = []
+    # Stateless single-tool scenarios picked by a substring of the prompt; safe under concurrent requests
+    routes: list = []
+    latency: float = 0.0
+    token_latency: float = 0.0
+    recorded_latency: bool = False
+    loop: bool = True
+    model_name: str = "replay"
+    _cursor: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_file(cls, path=None, **kwargs):
+        if not path:
+            return cls(responses=plan_to_responses(DEFAULT_PLAN), model_name="mock", **kwargs)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and "routes" in data:
+            return cls(routes=data["routes"], model_name=str(path), **kwargs)
+        return cls(responses=parse_transcript(data), model_name=str(path), **kwargs)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "replay_llm"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name=self.model_name, is_chat_model=False)
+
+    def reset(self):
+        with self._lock:
+            self._cursor = 0
+
+    def _route(self, prompt):
+        """
+        ReAct prompts (they list the tools) get the route's tool call, anything else (the rewrite) its text.
+        """
+        lowered = prompt.lower()
+        react = "Action Input" in prompt
+        for route in self.routes:
+            if route["match"].lower() in lowered:
+                if react:
+                    return plan_to_responses([{"tool": route["tool"], "args": route.get("args", {})}])[0]["response"]
+                return route.get("text", "Done.")
+        text = self.routes[-1].get("text", "Done.")
+        # no match: a ReAct prompt still needs output its parser accepts
+        return plan_to_responses([{"answer": text}])[0]["response"] if react else text
+
+    def _next(self, prompt=""):
+        if self.routes:
+            if self.latency > 0:
+                time.sleep(self.latency)
+            return self._route(prompt)
+        if not self.responses:
+            raise ValueError("Replay transcript is empty.")
+        # concurrent requests (the load test) must each take a different response
+        with self._lock:
+            if self._cursor >= len(self.responses):
+                if not self.loop:
+                    raise ValueError("Replay transcript is exhausted.")
+                self._cursor = 0
+            record = self.responses[self._cursor]
+            self._cursor += 1
+        delay = self.latency + (record.get("latency", 0.0) if self.recorded_latency else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return record["response"]
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        text = self._next(prompt)
+        if self.token_latency > 0:
+            time.sleep(self.token_latency * len(text.split()))
+        return CompletionResponse(text=text)
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        text = self._next(prompt)
+
+        def gen() -> CompletionResponseGen:
+            so_far = ""
+            for token in text.split(" "):
+                delta = token if not so_far else f" {token}"
+                so_far += delta
+                if self.token_latency > 0:
+                    time.sleep(self.token_latency)
+                yield CompletionResponse(text=so_far, delta=delta)
+
+        return gen()
+
+
+class RecordingLLM(CustomLLM):
+    """
+    Wraps a real LLM and appends every response, with its latency, to a JSON transcript
+    that `ReplayLLM` can replay later.
+    """
+    llm: Any = None
+    path: str = "transcript.json"
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "recording_llm"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.llm.metadata
+
+    def _record(self, text, latency):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            records = []
+        records.append({"response": text, "latency": round(latency, 4)})
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2)
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        start = time.perf_counter()
+        response = self.llm.chat(messages, **kwargs)
+        self._record(str(response.message.content), time.perf_counter() - start)
+        return response
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        start = time.perf_counter()
+        stream = self.llm.stream_chat(messages, **kwargs)
+
+        def gen() -> ChatResponseGen:
+            last = None
+            for last in stream:
+                yield last
+            self._record(str(last.message.content) if last else "", time.perf_counter() - start)
+
+        return gen()
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        start = time.perf_counter()
+        response = self.llm.complete(prompt, formatted=formatted, **kwargs)
+        self._record(response.text, time.perf_counter() - start)
+        return response
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        start = time.perf_counter()
+        stream = self.llm.stream_complete(prompt, formatted=formatted, **kwargs)
+
+        def gen() -> CompletionResponseGen:
+            last = None
+            for last in stream:
+                yield last
+            self._record(last.text if last else "", time.perf_counter() - start)
+
+        return gen()
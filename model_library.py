@@ -0,0 +1,231 @@
+"""
+Local, offline library of metabolic models: a directory of SBML files plus a JSON index
+(ids, names, organisms, sizes) that is searched before any remote repository is contacted.
+
+    python model_library.py add uploads/e_coli_core.xml --organism "Escherichia coli"
+    python model_library.py scan /data/bigg_models
+    python model_library.py search coli
+    python model_library.py prefetch
+"""
+from pathlib import Path
+from cobra.io import read_sbml_model, write_sbml_model
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+
+LIBRARY_DIR = Path(os.environ.get("MODEL_LIBRARY_DIR", "library"))
+SBML_SUFFIXES = ('.xml', '.sbml', '.xml.gz', '.sbml.gz')
+UPLOAD_DIR = Path("uploads").resolve()  # absolute, so checks against it don't depend on the cwd
+
+
+def read_model_file(file_path):
+    """
+    Parses an SBML file, transparently decompressing `.gz` files.
+    """
+    if str(file_path).endswith(".gz"):
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            return read_sbml_model(f)
+    return read_sbml_model(str(file_path))
+
+
+class ModelLibrary:
+    def __init__(self, root=LIBRARY_DIR):
+        self.root = Path(root)
+        self.models_dir = self.root / "models"
+        self.cache_dir = self.root / ".parsed"
+        self.index_path = self.root / "index.json"
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.entries = {e["id"]: e for e in json.load(f)}
+        self._keys = {mid: self._search_key(e) for mid, e in self.entries.items()}
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sorted(self.entries.values(), key=lambda e: e["id"]), f, indent=1)
+        os.replace(tmp, self.index_path)
+
+    @staticmethod
+    def _search_key(entry):
+        return " ".join(str(entry.get(k) or "") for k in ("id", "name", "organism")).lower()
+
+    @staticmethod
+    def _organism(model):
+        for key in ("taxonomy", "organism", "bqbiol:hasTaxon"):
+            value = model.annotation.get(key)
+            if value:
+                return value[0] if isinstance(value, list) else str(value)
+        return None
+
+    def get(self, model_id):
+        entry = self.entries.get(model_id)
+        if entry is None:
+            lowered = model_id.lower()
+            entry = next((e for mid, e in self.entries.items() if mid.lower() == lowered), None)
+        return entry
+
+    def add_file(self, path, model_id=None, organism=None, prefetch=True):
+        """
+        Copies an SBML file into the library, parses it once for its metadata and indexes it.
+        """
+        path = Path(path)
+        model_id = model_id or path.name.split(".")[0]
+        model = read_model_file(path)
+        target = self.models_dir / (model_id + "".join(path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]))
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        if path.resolve() != target.resolve():
+            shutil.copyfile(path, target)
+        return self._index(model, model_id, target, organism, prefetch)
+
+    def add_model(self, model, model_id=None, organism=None, prefetch=True):
+        """
+        Mirrors an in-memory model (e.g. one fetched from BiGG/BioModels) into the library.
+        """
+        model_id = model_id or model.id
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        target = self.models_dir / f"{model_id}.xml"
+        write_sbml_model(model, str(target))
+        return self._index(model, model_id, target, organism, prefetch)
+
+    def _index(self, model, model_id, target, organism, prefetch):
+        entry = {
+            "id": model_id,
+            "name": model.name or model.id,
+            "organism": organism or self._organism(model),
+            "reactions": len(model.reactions),
+            "metabolites": len(model.metabolites),
+            "genes": len(model.genes),
+            "file": str(target.relative_to(self.root)),
+            "file_bytes": target.stat().st_size,
+            "added": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with self._lock:
+            self.entries[model_id] = entry
+            self._keys[model_id] = self._search_key(entry)
+            self._save_index()
+        if prefetch:
+            self._write_cache(model_id, model)
+        return entry
+
+    def scan(self, directory, organism=None, prefetch=True):
+        added = []
+        for path in sorted(Path(directory).iterdir()):
+            if path.name.lower().endswith(SBML_SUFFIXES):
+                try:
+                    added.append(self.add_file(path, organism=organism, prefetch=prefetch))
+                except Exception as e:
+                    print(f"Skipping {path}: {e}")
+        return added
+
+    def search(self, query, limit=10):
+        """
+        Case-insensitive search over ids, names and organisms. Every word of the query must match;
+        exact id matches rank first, then id prefixes, then smaller models.
+        """
+        words = query.lower().split()
+        hits = []
+        for mid, key in self._keys.items():
+            if all(w in key for w in words):
+                lowered = mid.lower()
+                rank = 0 if lowered == query.lower() else 1 if lowered.startswith(words[0] if words else "") else 2
+                hits.append((rank, self.entries[mid]["reactions"], mid))
+        hits.sort()
+        return [self.entries[mid] for _, _, mid in hits[:limit]]
+
+    def _cache_path(self, model_id):
+        return self.cache_dir / f"{model_id}.pkl"
+
+    def _write_cache(self, model_id, model, cache_path=None):
+        cache_path = cache_path or self._cache_path(model_id)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+
+    def load(self, model_id):
+        """
+        Returns a parsed model from the library (pre-parsed cache first, then SBML) or None.
+        """
+        entry = self.get(model_id)
+        if entry is None:
+            return None
+        sbml_path = self.root / entry["file"]
+        cache_path = self._cache_path(entry["id"])
+        if cache_path.exists() and cache_path.stat().st_mtime >= sbml_path.stat().st_mtime:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        model = read_model_file(sbml_path)
+        self._write_cache(entry["id"], model)
+        return model
+
+    def load_file(self, path):
+        """
+        Parses any SBML file through the pre-parsed cache: library models use their own cache
+        entry, other files one keyed by their absolute path.
+        """
+        path = Path(path).resolve()
+        model_id = path.name.split(".")[0]
+        entry = self.entries.get(model_id)
+        if entry is not None and (self.root / entry["file"]).resolve() == path:
+            return self.load(model_id)
+        cache_path = self.cache_dir / "files" / (hashlib.sha1(str(path).encode()).hexdigest()[:16] + ".pkl")
+        if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        model = read_model_file(path)
+        self._write_cache(model_id, model, cache_path)
+        return model
+
+    def prefetch(self, model_ids=None):
+        """
+        Builds the pre-parsed cache for the given (default: all) models.
+        """
+        for model_id in model_ids or list(self.entries):
+            self.load(model_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=str(LIBRARY_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Add SBML files")
+    add.add_argument("paths", nargs="+")
+    add.add_argument("--organism", default=None)
+    scan = sub.add_parser("scan", help="Add every SBML file in a directory")
+    scan.add_argument("directory")
+    scan.add_argument("--organism", default=None)
+    search = sub.add_parser("search", help="Search the catalog")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    prefetch = sub.add_parser("prefetch", help="Pre-parse models for fast loading")
+    prefetch.add_argument("ids", nargs="*")
+    args = parser.parse_args()
+
+    library = ModelLibrary(args.root)
+    if args.command == "add":
+        for path in args.paths:
+            print(json.dumps(library.add_file(path, organism=args.organism)))
+    elif args.command == "scan":
+        print(f"Indexed {len(library.scan(args.directory, organism=args.organism))} models.")
+    elif args.command == "search":
+        for entry in library.search(args.query, args.limit):
+            print(f"{entry['id']:<24} {entry['reactions']:>6} rxns  {entry['organism'] or '-':<30} {entry['name']}")
+    elif args.command == "prefetch":
+        library.prefetch(args.ids or None)
+
+
+if __name__ == "__main__":
+    main()
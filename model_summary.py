@@ -0,0 +1,129 @@
+"""
+Array-backed summary of a model, built once per load and kept in step with the change journal.
+
+`model_data`, `model_info`, `/get_stats/` and `/list/{kind}` read from here instead of walking
+the cobra objects on every request.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from solver_pool import model_arrays
+
+KINDS = ("reactions", "metabolites", "genes")
+
+
+class ModelSummary:
+    def __init__(self, model, revision):
+        self.revision = revision
+        self.model_id = str(model.id)
+        self.ids = {
+            "reactions": np.array([r.id for r in model.reactions], dtype=object),
+            "metabolites": np.array([m.id for m in model.metabolites], dtype=object),
+            "genes": np.array([g.id for g in model.genes], dtype=object),
+        }
+        self.names = {
+            "reactions": np.array([r.name for r in model.reactions], dtype=object),
+            "metabolites": np.array([m.name for m in model.metabolites], dtype=object),
+            "genes": np.array([g.name for g in model.genes], dtype=object),
+        }
+        self.positions = {kind: {id_: i for i, id_ in enumerate(ids)} for kind, ids in self.ids.items()}
+        self.subsystems = np.array([r.subsystem or "" for r in model.reactions], dtype=object)
+        self._name_index = {}
+        arrays = model_arrays(model)
+        self.lower_bounds, self.upper_bounds = arrays["lb"], arrays["ub"]
+        # metabolites x reactions
+        self.S = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                            shape=(len(self.ids["metabolites"]), len(self.ids["reactions"])))
+        self.metabolite_degree = np.diff(self.S.indptr)
+        self.reaction_degree = np.bincount(self.S.indices, minlength=self.S.shape[1])
+        self.degrees = self._degree_stats()
+        self.groups_count = len(model.groups)
+        self.compartments = [v for k, v in model.compartments.items()]
+        self._set_objective(model)
+
+    def _set_objective(self, model):
+        self.objective = str(model.objective.expression) if model.objective.expression else "Not Set Yet"
+        self.objective_direction = model.objective.direction
+        self._refresh()
+
+    def _refresh(self):
+        self.data = {
+            "model_id": self.model_id,
+            "objective_reaction": self.objective,
+            "reactions_count": len(self.ids["reactions"]),
+            "metabolites_count": len(self.ids["metabolites"]),
+            "genes_count": len(self.ids["genes"]),
+            "groups_count": self.groups_count,
+            "compartments_count": len(self.compartments),
+            "Compartments": str(self.compartments),
+        }
+        self.stats = f"""
+        Model ID: {self.model_id}\n
+        Objective Reaction: {self.objective}\n
+        Reactions Count: {self.data['reactions_count']}\n
+        Metabolites Count: {self.data['metabolites_count']}\n
+        Genes Count: {self.data['genes_count']}\n
+        Groups Count": {self.groups_count}\n
+        Compartments Count": {len(self.compartments)}\n
+        Compartments: {self.data['Compartments']}\n
+        """
+
+    def apply(self, entries, model):
+        """
+        Replays journal entries (bounds, objective, knockouts) onto the arrays.
+        """
+        for entry in entries:
+            for rxn_id, change in entry.get("changes", {}).items():
+                i = self.positions["reactions"][rxn_id]
+                self.lower_bounds[i], self.upper_bounds[i] = change["new"]
+            if entry["kind"] == "objective":
+                self._set_objective(model)
+            self.revision = entry["revision"]
+
+    def page(self, kind, offset=0, limit=10, field="name"):
+        """
+        One page of ids or names; reactions also carry their bounds.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown query: {kind}")
+        rows = slice(max(0, offset), max(0, offset) + max(0, limit))
+        if field == "name":
+            return self.names[kind][rows].tolist()
+        items = [{"id": i, "name": n} for i, n in zip(self.ids[kind][rows], self.names[kind][rows])]
+        if kind == "reactions":
+            for item, lb, ub in zip(items, self.lower_bounds[rows], self.upper_bounds[rows]):
+                item["lower_bound"], item["upper_bound"] = float(lb), float(ub)
+        return items
+
+    def find(self, kind, names):
+        """
+        Positions (in model order) of the items whose name is one of `names`.
+        """
+        if kind not in self._name_index:
+            index = {}
+            for i, name in enumerate(self.names[kind]):
+                index.setdefault(name, []).append(i)
+            self._name_index[kind] = index
+        index = self._name_index[kind]
+        return sorted({i for name in names for i in index.get(name, ())})
+
+    def in_subsystem(self, subsystem):
+        """
+        Positions of the reactions in a subsystem (case-insensitive).
+        """
+        return np.flatnonzero(np.char.lower(self.subsystems.astype(str)) == subsystem.strip().lower())
+
+    def _degree_stats(self):
+        """
+        Reactions per metabolite and metabolites per reaction: mean, max and the most connected.
+        """
+        stats = {}
+        for kind, degree in (("metabolites", self.metabolite_degree), ("reactions", self.reaction_degree)):
+            if len(degree) == 0:
+                continue
+            top = np.argsort(degree)[::-1][:5]
+            stats[kind] = {
+                "mean": round(float(degree.mean()), 2),
+                "max": int(degree.max()),
+                "top": [{"id": self.ids[kind][i], "degree": int(degree[i])} for i in top],
+            }
+        return stats
@@ -1,6 +1,21 @@
 import cobra
 from cobra.io import read_sbml_model
 from cobra.io.web.load import load_model, BiGGModels, BioModels
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from model_library import ModelLibrary, read_model_file, SBML_SUFFIXES
+from solver_pool import SolverPool
+from model_summary import ModelSummary
+from compression import compress
+from precompute import Precomputer
+from solver_policy import SolverPolicy
+from flux_store import FluxStore
+from metrics import span
+import os
+import threading
+import time
+
+JOURNAL_LENGTH = 1000
 
 class ModelManager:
     def __init__(self):
@@ -8,34 +23,305 @@ class ModelManager:
         self.current_model_id = None
         self.bounds_data = None
         self.objective = False
+        self.load_status = {}   # model_id -> {"status": "parsing" | "ready" | "error", ...}
+        self.hashes = {}        # sha256 of the uploaded file -> (model_id, revision it was loaded at)
+        self._latest_upload = None
+        self._parser = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sbml-parser")
+        self.library = ModelLibrary()
+        # COBRA_OFFLINE=1 disables the BiGG/BioModels fallback (e.g. on air-gapped compute nodes)
+        self.allow_remote = os.environ.get("COBRA_OFFLINE", "0") != "1"
+        # persistent FVA/knockout workers; SOLVER_POOL=0 falls back to cobra's per-call pools
+        self.solver_pool = SolverPool() if os.environ.get("SOLVER_POOL", "1") != "0" else None
+        # every change to a model goes through set_bounds/set_objective/knock_out and is journaled,
+        # so caches can key on (model_id, revision) and replay only what changed
+        self.revisions = {}     # model_id -> revision, bumped on every load and change
+        self.journals = {}      # model_id -> recent change entries
+        self.listeners = []     # callables(model_id, entry) notified after every change
+        self._journal_lock = threading.RLock()
+        self.summaries = {}     # model_id -> ModelSummary
+        self.compressions = {}  # model_id -> Compression of the model at some revision
+        self._compress_lock = threading.Lock()
+        self.compress = os.environ.get("MODEL_COMPRESSION", "1") != "0"
+        # FBA, blocked reactions and gene essentiality are precomputed in the background after every change
+        # every FBA/pFBA flux vector, by revision and scenario fingerprint
+        self.fluxes = FluxStore()
+        # which backend runs each analysis, from measured timings (solver_policy.py calibrate)
+        self.policy = SolverPolicy(self)
+        self.precompute = Precomputer(self, enabled=os.environ.get("PRECOMPUTE", "1") != "0")
+        self.add_listener(self._on_change)
 
     def load_model_by_id(self, model_id):
         if "xml" not in model_id:
             model_id = f"{model_id}.xml"
         base_model_id = model_id.split(".")[0]
 
+        with span("io", "load_library_model"):
+            model = self.library.load(base_model_id)
+        if model is not None:
+            return self._set_loaded(self.library.get(base_model_id)["id"], model)
+        if not self.allow_remote:
+            return {"response": f"Model {base_model_id} is not in the local model library and remote repositories are disabled."}
+
         try:
             repositories = [BioModels(), BiGGModels()]
-            model = load_model(base_model_id, repositories=repositories)
+            with span("io", "load_remote_model"):
+                model = load_model(base_model_id, repositories=repositories)
             if model:
-                self.models[base_model_id] = model
-                self.current_model_id = base_model_id
-                if model.objective:
-                    self.objective = True
-                return base_model_id
+                # mirror it so the next load (and air-gapped nodes sharing the library) stay local
+                self.library.add_model(model, base_model_id)
+                return self._set_loaded(base_model_id, model)
         except Exception as e:
             return {"response": f"Error loading from remote repositories: {e}"}
 
-    def load_sbml(self, file_path):
+    def _set_loaded(self, model_id, model):
+        self._register(model_id, model)
+        self.current_model_id = model_id
+        if model.objective:
+            self.objective = True
+        return model_id
+
+    def load_sbml(self, file_path, make_current=True):
         model_id = str(file_path).split("/")[-1].split(".")[0]
-        model = read_sbml_model(file_path)
+        with span("io", "parse_sbml"):
+            model = read_model_file(file_path)
         # model_oject = Model(model, model_id)
+        self._register(model_id, model)
+        if make_current:
+            self.current_model_id = model_id
+            if model.objective:
+                self.objective = True
+        return model_id
+
+    def _register(self, model_id, model):
+        """
+        Stores a freshly loaded model. Missing bounds are filled in once here rather than by every reader.
+        """
+        for rxn in model.reactions:
+            if rxn.lower_bound is None:
+                rxn.lower_bound = -1000.0
+            if rxn.upper_bound is None:
+                rxn.upper_bound = 1000.0
         self.models[model_id] = model
-        self.current_model_id = model_id
-        if model.objective:
+        # an upload hash must not point at whatever model later takes over its id
+        self.hashes = {h: loaded for h, loaded in self.hashes.items() if loaded[0] != model_id}
+        entry = self._record(model_id, "load", reactions=len(model.reactions))
+        self.summaries[model_id] = ModelSummary(model, entry["revision"])
+
+    def get_summary(self, model_id=None):
+        """
+        The model's summary at its current revision, replaying journaled changes or rebuilding it.
+        """
+        model_id = model_id or self.current_model_id
+        if model_id not in self.models:
+            return None
+        with self._journal_lock:
+            summary = self.summaries.get(model_id)
+            revision = self.get_revision(model_id)
+            if summary is None or summary.revision != revision:
+                entries = self.changes_since(summary.revision, model_id) if summary else None
+                if entries is None:
+                    summary = self.summaries[model_id] = ModelSummary(self.models[model_id], revision)
+                else:
+                    summary.apply(entries, self.models[model_id])
+            return summary
+
+    def _record(self, model_id, kind, **details):
+        with self._journal_lock:
+            revision = self.revisions.get(model_id, 0) + 1
+            self.revisions[model_id] = revision
+            entry = {"revision": revision, "kind": kind, "time": time.time(), **details}
+            self.journals.setdefault(model_id, deque(maxlen=JOURNAL_LENGTH)).append(entry)
+        for listener in list(self.listeners):
+            listener(model_id, entry)
+        return entry
+
+    def _on_change(self, model_id, entry):
+        self.precompute.schedule(model_id)
+        if entry["kind"] == "load":
+            self.compressions.pop(model_id, None)
+            self.fluxes.clear(model_id)
+            self.policy.forget(model_id)
+            if self.solver_pool is not None:
+                # a reloaded model has a new stoichiometric matrix; bound/objective changes travel as deltas
+                self.solver_pool.release(model_id)
+                self.solver_pool.release(f"{model_id}:compressed")
+
+    def get_compressed(self, model_id=None):
+        """
+        The reduced model used by FVA, knockouts and sampling, at the current revision. Objective changes
+        are carried over; any other change recompresses. None when compression is off, the model has
+        constraints beyond its stoichiometry, or it is infeasible.
+        """
+        model_id = model_id or self.current_model_id
+        model = self.models.get(model_id)
+        if not self.compress or model is None or not SolverPool.supports(model):
+            return None
+        with self._compress_lock:
+            compressed = self.compressions.get(model_id)
+            revision = self.get_revision(model_id)
+            if compressed is not None and compressed.revision != revision:
+                entries = self.changes_since(compressed.revision, model_id)
+                if entries is not None and all(e["kind"] == "objective" for e in entries):
+                    compressed.update_objective(model)
+                    compressed.revision = revision
+                else:
+                    compressed = None
+            if compressed is None:
+                with span("model", "compress"):
+                    compressed = compress(model, revision, f"{model_id}:compressed", self.solver_pool, model_id)
+                if compressed is None:
+                    return None
+                self.compressions[model_id] = compressed
+            return compressed
+
+    def compress_snapshot(self, model_id, snapshot, revision):
+        """
+        Builds the reduced model from a private copy taken at `revision`, in the calling thread and
+        without the solver pool (for background work). Kept only if the model is still at that revision.
+        """
+        if not self.compress or not SolverPool.supports(snapshot):
+            return None
+        with span("model", "compress"):
+            compressed = compress(snapshot, revision, f"{model_id}:compressed", processes=1)
+        with self._compress_lock:
+            current = self.compressions.get(model_id)
+            if current is not None and current.revision == revision:
+                return current  # an interactive request got there first
+            if compressed is not None and self.get_revision(model_id) == revision:
+                self.compressions[model_id] = compressed
+        return compressed
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def get_revision(self, model_id=None):
+        return self.revisions.get(model_id or self.current_model_id, 0)
+
+    def changes_since(self, revision, model_id=None):
+        """
+        Journal entries after `revision`, oldest first. Returns None when the model was reloaded or
+        the journal no longer reaches back that far; the caller then has to rebuild from scratch.
+        """
+        model_id = model_id or self.current_model_id
+        with self._journal_lock:
+            entries = [e for e in self.journals.get(model_id, ()) if e["revision"] > revision]
+        if any(e["kind"] == "load" for e in entries):
+            return None
+        if entries and entries[0]["revision"] != revision + 1:
+            return None
+        return entries
+
+    def set_bounds(self, bounds, model_id=None):
+        """
+        Applies (reaction_id, lower, upper) rows. Reactions missing from the model are skipped;
+        only bounds that actually change are applied and journaled.
+        """
+        model_id = model_id or self.current_model_id
+        model = self.models[model_id]
+        # convert and check everything first so a bad row can't leave the model half-updated
+        rows = [(rxn_id, (float(lval), float(uval))) for rxn_id, lval, uval in bounds if rxn_id in model.reactions]
+        for rxn_id, (lo, hi) in rows:
+            if lo > hi:
+                raise ValueError(f"The lower bound must be less or equal to the upper bound ({rxn_id}: {lo} > {hi}).")
+        changes = {}
+        with self._journal_lock:
+            try:
+                for rxn_id, new in rows:
+                    rxn = model.reactions.get_by_id(rxn_id)
+                    if rxn.bounds != new:
+                        old = rxn.bounds
+                        rxn.bounds = new
+                        changes[rxn_id] = {"old": old, "new": new}
+            finally:
+                # whatever was applied is journaled, so caches keyed by revision never go stale
+                if changes:
+                    self._record(model_id, "bounds", changes=changes)
+        return changes
+
+    def set_objective(self, objective, direction="max", model_id=None):
+        """
+        Sets a linear objective from {reaction_id: coefficient}.
+        """
+        model_id = model_id or self.current_model_id
+        model = self.models[model_id]
+        missing = [rxn_id for rxn_id in objective if rxn_id not in model.reactions]
+        if missing:
+            raise KeyError(f"Reaction '{missing[0]}' not found in model.")
+        with self._journal_lock:
+            old = {rxn.id: rxn.objective_coefficient for rxn in model.reactions if rxn.objective_coefficient}
+            model.objective = {model.reactions.get_by_id(rxn_id): float(c) for rxn_id, c in objective.items()}
+            model.objective.direction = direction.lower()
+            self._record(model_id, "objective", old=old, new={k: float(v) for k, v in objective.items()},
+                         direction=model.objective.direction)
+        if model_id == self.current_model_id:
             self.objective = True
+        return model.objective
+
+    def knock_out(self, reaction_ids=(), gene_ids=(), model_id=None):
+        """
+        Permanently knocks out reactions and/or genes (for what-if analyses use a model context instead).
+        """
+        model_id = model_id or self.current_model_id
+        model = self.models[model_id]
+        with self._journal_lock:
+            before = {rxn.id: rxn.bounds for rxn in model.reactions}
+            for rxn_id in reaction_ids:
+                model.reactions.get_by_id(rxn_id).knock_out()
+            for gene_id in gene_ids:
+                model.genes.get_by_id(gene_id).knock_out()
+            changes = {rxn.id: {"old": before[rxn.id], "new": rxn.bounds}
+                       for rxn in model.reactions if rxn.bounds != before[rxn.id]}
+            self._record(model_id, "knockout", reactions=list(reaction_ids), genes=list(gene_ids), changes=changes)
+        return changes
+
+    def submit_sbml(self, file_path, sha256):
+        """
+        Parses an uploaded SBML file in the background. Returns (status dict, future or None);
+        a file whose hash matches an already-parsed model reuses that model without parsing, as
+        long as the model has not been changed since it was loaded.
+        """
+        cached_id, loaded_at = self.hashes.get(sha256, (None, None))
+        if cached_id in self.models and self.get_revision(cached_id) == loaded_at:
+            self.current_model_id = cached_id
+            self._latest_upload = cached_id
+            self.objective = bool(self.models[cached_id].objective)
+            return {"status": "ready", "model_id": cached_id, "sha256": sha256, "cached": True}, None
+
+        model_id = str(file_path).split("/")[-1].split(".")[0]
+        self._latest_upload = model_id
+        self.load_status[model_id] = {"status": "parsing", "sha256": sha256}
+        future = self._parser.submit(self._parse_upload, file_path, model_id, sha256)
+        return {"status": "parsing", "model_id": model_id, "sha256": sha256, "cached": False}, future
+
+    def _parse_upload(self, file_path, model_id, sha256):
+        try:
+            self.load_sbml(file_path, make_current=False)
+        except Exception as e:
+            self.load_status[model_id] = {"status": "error", "sha256": sha256, "detail": str(e)}
+            raise
+        self.hashes[sha256] = (model_id, self.get_revision(model_id))
+        # only the most recent upload becomes the current model
+        if self._latest_upload == model_id:
+            self.current_model_id = model_id
+            self.objective = bool(self.models[model_id].objective)
+        self.load_status[model_id] = {"status": "ready", "sha256": sha256}
         return model_id
 
+    def get_load_status(self, model_id):
+        if model_id in self.load_status:
+            return {"model_id": model_id, **self.load_status[model_id], "revision": self.get_revision(model_id)}
+        if model_id in self.models:
+            return {"model_id": model_id, "status": "ready", "revision": self.get_revision(model_id)}
+        return None
+
+    def pool_for(self, model):
+        """
+        The solver pool if it can handle the given model, otherwise None (use cobra).
+        """
+        if self.solver_pool is not None and SolverPool.supports(model):
+            return self.solver_pool
+        return None
+
     def get_current_model(self):
         if not self.current_model_id:
             return {"response": "No model is currently loaded."}
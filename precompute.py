@@ -0,0 +1,198 @@
+"""
+Background precomputation of the analyses users usually ask for right after loading a model:
+the reference FBA solution, the reduced model (which finds the blocked reactions) and single-gene
+deletion growth for every gene.
+
+One low-priority thread works through the queued models in small steps. Before every step it waits
+until no interactive request is running, and it drops its work as soon as the model changes
+(results are keyed by model revision) or the job is cancelled.
+"""
+from contextlib import contextmanager
+import threading
+import time
+
+import pandas as pd
+from cobra.flux_analysis import single_gene_deletion
+
+from solver_pool import deletion_sets
+
+TASKS = ("fba", "compression", "gene_deletion")
+CHUNK_SIZE = 50
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Precomputer:
+    def __init__(self, manager, enabled=True):
+        self.manager = manager
+        self.enabled = enabled
+        self.results = {}   # model_id -> {"revision": r, task: result, ...}
+        self.progress = {}  # model_id -> {"revision", "state", "done", "seconds"}
+        self._pending = []
+        self._cancelled = set()
+        self._interactive = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._wake = threading.Condition()
+        self._thread = None
+
+    # ---- interactive requests ----
+
+    @contextmanager
+    def interactive(self):
+        """
+        Marks an interactive request; background work pauses until none are running.
+        """
+        with self._wake:
+            self._interactive += 1
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            with self._wake:
+                self._interactive -= 1
+                if self._interactive == 0:
+                    self._idle.set()
+
+    # ---- scheduling ----
+
+    def schedule(self, model_id):
+        if not self.enabled:
+            return
+        with self._wake:
+            self._cancelled.discard(model_id)
+            if model_id not in self._pending:
+                self._pending.append(model_id)
+            self.progress[model_id] = {"revision": self.manager.get_revision(model_id), "state": "queued", "done": []}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="precompute", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def cancel(self, model_id=None):
+        """
+        Stops queued and running work for one model (default: all models).
+        """
+        with self._wake:
+            targets = [model_id] if model_id else list(set(self._pending) | set(self.progress))
+            for target in targets:
+                self._cancelled.add(target)
+                if target in self._pending:
+                    self._pending.remove(target)
+                if target in self.progress and self.progress[target]["state"] in ("queued", "running"):
+                    self.progress[target]["state"] = "cancelled"
+        return targets
+
+    def get(self, task, model_id=None):
+        """
+        A precomputed result, only if it was computed at the model's current revision.
+        """
+        model_id = model_id or self.manager.current_model_id
+        results = self.results.get(model_id)
+        if results is None or results["revision"] != self.manager.get_revision(model_id):
+            return None
+        return results.get(task)
+
+    def status(self):
+        return {model_id: {**p, "current": p["revision"] == self.manager.get_revision(model_id)}
+                for model_id, p in self.progress.items()}
+
+    # ---- worker ----
+
+    def _loop(self):
+        while True:
+            with self._wake:
+                while not self._pending:
+                    self._wake.wait()
+                model_id = self._pending.pop(0)
+            try:
+                self._run(model_id)
+            except Cancelled:
+                if self.progress.get(model_id, {}).get("state") == "running":
+                    self.progress[model_id]["state"] = "stale"
+            except Exception as e:
+                self.progress[model_id] = {**self.progress.get(model_id, {}), "state": "error", "detail": str(e)}
+
+    def _checkpoint(self, model_id, revision):
+        """
+        Waits for interactive requests to finish; gives up if the model changed or the job was cancelled.
+        """
+        while not self._idle.wait(timeout=0.5):
+            if model_id in self._cancelled:
+                break
+        if model_id in self._cancelled or self.manager.get_revision(model_id) != revision:
+            raise Cancelled()
+
+    def _run(self, model_id):
+        manager = self.manager
+        model = manager.models.get(model_id)
+        if model is None:
+            return
+        revision = manager.get_revision(model_id)
+        self._checkpoint(model_id, revision)
+        with manager._journal_lock:
+            if manager.get_revision(model_id) != revision:
+                raise Cancelled()
+            # a private copy: the background solves never touch the solver the tools are using
+            snapshot = model.copy()
+        start = time.perf_counter()
+        progress = self.progress[model_id] = {"revision": revision, "state": "running", "done": []}
+        results = {"revision": revision}
+        self.results[model_id] = results
+
+        for task in TASKS:
+            self._checkpoint(model_id, revision)
+            if task == "fba":
+                solution = snapshot.optimize()
+                results["fba"] = {"objective_value": solution.objective_value, "status": solution.status,
+                                  "fluxes": solution.fluxes}
+            elif task == "compression":
+                # on the snapshot in this thread, so the solver pool stays free for interactive requests
+                results["compression"] = manager.compress_snapshot(model_id, snapshot, revision)
+            elif task == "gene_deletion":
+                results["gene_deletion"] = self._gene_deletion(model_id, revision, snapshot)
+            progress["done"].append(task)
+        progress.update(state="done", seconds=round(time.perf_counter() - start, 3))
+
+    def _gene_deletion(self, model_id, revision, snapshot):
+        genes = list(snapshot.genes)
+        tables = []
+        for i in range(0, len(genes), CHUNK_SIZE):
+            self._checkpoint(model_id, revision)
+            tables.append(gene_deletion_table(self.manager, model_id, [g.id for g in genes[i:i + CHUNK_SIZE]], snapshot))
+        if not tables:
+            return pd.DataFrame(columns=["growth", "status"])
+        return pd.concat(tables)
+
+
+def gene_deletion_table(manager, model_id, gene_ids, snapshot=None):
+    """
+    Growth after knocking out each gene, as a table indexed by gene id (growth, status). Uses the
+    solver pool (and the reduced model) when possible, otherwise cobra on `snapshot` (or the model).
+    """
+    model = manager.models[model_id]
+    pool = manager.pool_for(model)
+    compressed = manager.get_compressed(model_id) if pool else None
+    if pool:
+        genes = [model.genes.get_by_id(g) for g in gene_ids]
+        sets = deletion_sets(genes)
+        if compressed:
+            table = pool.deletion_table(compressed.key, compressed.model, gene_ids, compressed.gene_knockouts(sets))
+        else:
+            table = pool.gene_deletion(model_id, model, sets)
+            table["ids"] = gene_ids
+    else:
+        target = snapshot if snapshot is not None else model
+        table = single_gene_deletion(target, gene_list=[target.genes.get_by_id(g) for g in gene_ids], processes=1)
+        table["ids"] = [next(iter(ids)) for ids in table["ids"]]
+    return table.set_index("ids")[["growth", "status"]]
+
+
+def essential_genes(table, reference, threshold=0.01):
+    """
+    Genes whose knockout leaves less than `threshold` of the reference growth (or no solution).
+    """
+    growth = table["growth"].fillna(0.0)
+    return sorted(table.index[growth < threshold * reference])
@@ -37,13 +37,20 @@ Each model contains:
 
 The system uses the following tools:
 - `load_model(model_id)`: Loads a model from an API from a given user query's model ID.
+- `search_model_library(query, limit)`: Searches the local model library by model ID, name or organism.
 - `model_data()`: Return counts of reactions, metabolites, and genes of the current working model.
 - `model_info(query, count)`: Returns categorical data for a given model based on a query (e.g., "reactions", "genes", "metabolites") and an optional count.
 - `get_current_model_id()`: Returns the current model ID from the ModelManager.
 - `reaction_info(reaction_id)`: Returns detailed information/Metadata about a specific reaction, including its bounds, EC number, and associated genes.
 - `metabolite_info(metabolite_id)`: Returns detailed information/Metadata about a specific metabolite, including its compartments and associated reactions.
 - `gene_info(gene_id)`: Returns detailed information/Metadata about a specific gene, including its associated reactions and gene-reaction rules.
-- `run_flux_balance_analysis()`: Runs Flux Balance Analysis on a model and returns Objective Value and Status of the simulation. **RUN DIRECTLY**
+- `run_flux_balance_analysis(pfba)`: Runs Flux Balance Analysis (or parsimonious FBA with `pfba=True`) on a model and returns Objective Value, Status and the `run_id` of the stored flux vector. **RUN DIRECTLY**
+- `compare_flux_runs(run_a, run_b, top_k)`: Lists the reactions whose flux changed most between two stored runs (default: the last two), e.g. "what changed versus the previous condition?".
+- `find_essential_genes(threshold)`: Lists genes whose single knockout drops growth below `threshold` (default 0.01) of the wild-type growth.
+- `reaction_deletion_screen(subsystem, threshold)`: Knocks out every reaction (or every reaction of a subsystem, e.g. "Glycolysis/Gluconeogenesis") one at a time and returns a ranked summary; the full table is saved as CSV.
+- `parametric_sweep(reaction_ids, start, stop, steps, bound, target_reaction)`: Varies the bound of one or two reactions (e.g. `EX_glc__D_e`, `EX_o2_e`) over a grid and reports the objective (or the min/max flux of `target_reaction`) at every point; saves the full surface as a .npy file.
+- `screen_models(directory, analysis, threshold)`: Runs FBA, gene essentiality or reaction essentiality on every SBML model of a directory (default: the local model library) under the uploaded media bounds; results go to one CSV table.
+- FBA, FVA, knockout and sweep tools accept an optional `deadline` in seconds. Their results include a `solver` entry (backend and time); when it lists `unfinished` entries, tell the user the result is partial.
 
 
 The system maintains:
@@ -0,0 +1,171 @@
+"""
+Runs one analysis over every SBML model in a directory, one model per worker process, and
+streams the results into a single CSV table as models finish.
+
+Analyses: "fba" (one row per model), "gene_essentiality" and "reaction_essentiality" (one row
+per gene or reaction). Shared media bounds ((reaction_id, lower, upper) rows, as in the bounds
+CSV) are applied to every model first; reactions a model lacks are skipped and counted. Models
+are parsed through the model library's pre-parsed cache.
+
+    python screening.py /data/vmh --analysis gene_essentiality --bounds uploads/bounds_data/e_coli_bounds.csv
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import argparse
+import csv
+import math
+import os
+import time
+
+import pandas as pd
+from cobra.flux_analysis import single_gene_deletion, single_reaction_deletion
+
+from model_library import LIBRARY_DIR, SBML_SUFFIXES, ModelLibrary
+from solver_pool import process_context
+from streaming import emit
+
+ANALYSES = ("fba", "gene_essentiality", "reaction_essentiality")
+COLUMNS = {
+    "fba": ["model", "reactions", "metabolites", "genes", "media_applied", "media_missing",
+            "status", "objective", "seconds", "detail"],
+    "essentiality": ["model", "id", "growth", "relative_growth", "essential", "status", "detail"],
+}
+SCREEN_DIR = Path("outputs/screens")
+ESSENTIAL_THRESHOLD = 0.01
+
+
+def check_directory(directory, roots):
+    """
+    The resolved directory, if it is one of `roots` or inside one; raises ValueError otherwise.
+    """
+    path = Path(directory).resolve()
+    allowed = [Path(root).resolve() for root in roots]
+    if not any(path == root or root in path.parents for root in allowed):
+        raise ValueError(f"Directory '{directory}' is outside the model library and upload folders.")
+    if not path.is_dir():
+        raise ValueError(f"Directory '{directory}' not found.")
+    return path
+
+
+def model_files(directory):
+    """
+    The SBML files of a directory, largest first so the longest jobs start early.
+    """
+    paths = [p for p in Path(directory).iterdir() if p.name.lower().endswith(SBML_SUFFIXES)]
+    return sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+
+
+def apply_media(model, bounds):
+    """
+    Applies (reaction_id, lower, upper) rows; returns how many applied and how many were missing.
+    """
+    applied = missing = 0
+    for rxn_id, lval, uval in bounds or []:
+        rxn_id = str(rxn_id).strip()
+        if rxn_id in model.reactions:
+            model.reactions.get_by_id(rxn_id).bounds = (float(lval), float(uval))
+            applied += 1
+        else:
+            missing += 1
+    return applied, missing
+
+
+def _screen_model(path, analysis, bounds, library_root, threshold):
+    start = time.perf_counter()
+    name = Path(path).name.split(".")[0]
+    try:
+        model = ModelLibrary(library_root).load_file(path)
+        applied, missing = apply_media(model, bounds)
+        reference = model.slim_optimize(error_value=math.nan)
+        if analysis == "fba":
+            return [{"model": name, "reactions": len(model.reactions), "metabolites": len(model.metabolites),
+                     "genes": len(model.genes), "media_applied": applied, "media_missing": missing,
+                     "status": model.solver.status, "objective": reference,
+                     "seconds": round(time.perf_counter() - start, 4)}]
+        if math.isnan(reference) or reference <= 0:
+            return [{"model": name, "status": "no growth", "detail": f"reference objective is {reference}"}]
+        # one process per model already; cobra must not start its own pool inside the worker
+        if analysis == "gene_essentiality":
+            table = single_gene_deletion(model, processes=1)
+        else:
+            table = single_reaction_deletion(model, processes=1)
+        growth = table["growth"].fillna(0.0)
+        return [{"model": name, "id": next(iter(ids)), "growth": g, "relative_growth": g / reference,
+                 "essential": g < threshold * reference, "status": status}
+                for ids, g, status in zip(table["ids"], growth, table["status"])]
+    except Exception as e:
+        return [{"model": name, "status": "error", "detail": str(e)}]
+
+
+def screen(directory, analysis="fba", bounds=None, processes=None, threshold=ESSENTIAL_THRESHOLD,
+           library_root=LIBRARY_DIR):
+    """
+    Yields (model file, rows) as each model finishes.
+    """
+    if analysis not in ANALYSES:
+        raise ValueError(f"Unknown analysis: {analysis}. Choose one of {', '.join(ANALYSES)}.")
+    paths = model_files(directory)
+    if not paths:
+        return
+    processes = min(len(paths), processes or int(os.environ.get("SCREEN_PROCESSES", 0)) or os.cpu_count() or 1)
+    bounds = [list(row) for row in bounds or []]
+    with ProcessPoolExecutor(max_workers=processes, mp_context=process_context(["screening"])) as pool:
+        futures = {pool.submit(_screen_model, str(p), analysis, bounds, str(library_root), threshold): p
+                   for p in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def run_screen(directory, analysis="fba", bounds=None, processes=None, threshold=ESSENTIAL_THRESHOLD,
+               output=None):
+    """
+    Screens a directory into one CSV, emitting a `screen_model` event per finished model.
+    Returns a short summary.
+    """
+    start = time.perf_counter()
+    SCREEN_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(output or SCREEN_DIR / f"screen_{analysis}_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    columns = COLUMNS["fba" if analysis == "fba" else "essentiality"]
+    per_model = []
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for path, rows in screen(directory, analysis, bounds, processes, threshold):
+            writer.writerows(rows)
+            f.flush()
+            failed = len(rows) == 1 and rows[0]["status"] in ("error", "no growth")
+            if analysis == "fba" or failed:
+                result = {k: rows[0].get(k) for k in ("model", "status", "objective", "detail") if k in rows[0]}
+            else:
+                result = {"model": rows[0]["model"], "status": "optimal", "tested": len(rows),
+                          "essential": sum(bool(r["essential"]) for r in rows)}
+            per_model.append(result)
+            emit("screen_model", done=len(per_model), **result)
+    failed = [r for r in per_model if r["status"] in ("error", "no growth")]
+    return {
+        "analysis": analysis,
+        "models": len(per_model),
+        "failed": len(failed),
+        "file": str(output),
+        "seconds": round(time.perf_counter() - start, 3),
+        "results": per_model,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory")
+    parser.add_argument("--analysis", choices=ANALYSES, default="fba")
+    parser.add_argument("--bounds", default=None, help="CSV of reaction_id, lower, upper rows")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--threshold", type=float, default=ESSENTIAL_THRESHOLD)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    bounds = pd.read_csv(args.bounds).values.tolist() if args.bounds else None
+    summary = run_screen(args.directory, args.analysis, bounds, args.processes, args.threshold, args.output)
+    print(f"Screened {summary['models']} models ({summary['failed']} failed) in {summary['seconds']} s "
+          f"-> {summary['file']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Chooses how each analysis is solved and bounds how long it may take.
+
+Backends are the persistent solver pool ("pool", resident GLPK problems) and the LP interfaces
+optlang finds installed (glpk, highs, cplex, gurobi, scipy, ...). The backend for an analysis and
+model size is the fastest one measured by `python solver_policy.py calibrate <model.xml>` (kept
+in SOLVER_PROFILE); without measurements the pool is preferred, then the model's own solver.
+
+Every request gets a deadline (SOLVER_DEADLINE seconds unless the tool is given one). Each LP is
+time-limited to what is left of it, FVA and knockouts on cobra run in chunks, and whatever was
+not solved in time is reported as unfinished instead of blocking a worker indefinitely.
+
+    python solver_policy.py calibrate uploads/e_coli_core.xml
+    python solver_policy.py show
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+import optlang
+import pandas as pd
+from cobra.flux_analysis import (flux_variability_analysis, single_gene_deletion, double_gene_deletion,
+                                 single_reaction_deletion, double_reaction_deletion)
+
+from model_library import read_model_file
+from solver_pool import SolverPool, deletion_sets
+
+ANALYSES = ("fba", "fva", "knockout")
+SIZE_CLASSES = ((1000, "small"), (5000, "medium"), (math.inf, "large"))
+LP_BACKENDS = ("gurobi", "cplex", "mosek", "highs", "glpk", "scipy")
+DEFAULT_DEADLINE = float(os.environ.get("SOLVER_DEADLINE", 120))
+SOLVER_PROFILE = Path(os.environ.get("SOLVER_PROFILE", "solver_profile.json"))
+CHUNKS = 10
+
+
+def installed_backends():
+    return [name for name in LP_BACKENDS if optlang.available_solvers.get(name.upper())]
+
+
+def size_class(model):
+    return next(name for limit, name in SIZE_CLASSES if len(model.reactions) <= limit)
+
+
+def interface_name(model):
+    return model.solver.interface.__name__.split(".")[-1].replace("_interface", "")
+
+
+class Deadline:
+    def __init__(self, seconds=None):
+        self.seconds = float(seconds or DEFAULT_DEADLINE)
+        self.start = time.time()
+        self.at = self.start + self.seconds
+
+    def remaining(self):
+        return max(0.0, self.at - time.time())
+
+    def expired(self):
+        return time.time() >= self.at
+
+    def elapsed(self):
+        return time.time() - self.start
+
+
+@contextmanager
+def solver_timeout(model, deadline):
+    """
+    Limits every LP of `model` to the time left before the deadline (where the interface supports
+    time limits; otherwise only the chunking bounds the request).
+    """
+    configuration = model.solver.configuration
+    previous = configuration.timeout
+    try:
+        configuration.timeout = max(1, math.ceil(deadline.remaining()))
+        limited = True
+    except ValueError:
+        limited = False
+    try:
+        yield
+    finally:
+        if limited:
+            configuration.timeout = previous
+
+
+def _chunks(items, start=False):
+    size = max(1, math.ceil(len(items) / CHUNKS))
+    return [(i, items[i:i + size]) if start else items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fva_with_deadline(model, reactions, fraction_of_optimum, deadline):
+    """
+    cobra FVA in chunks, in this process (a cobra process pool per chunk would cost more than it
+    saves); reactions not reached before the deadline are NaN (`attrs["unfinished"]`).
+    """
+    frames = []
+    with solver_timeout(model, deadline):
+        for chunk in _chunks(list(reactions)):
+            if deadline.expired():
+                break
+            frames.append(flux_variability_analysis(model, chunk, fraction_of_optimum=fraction_of_optimum,
+                                                    processes=1))
+    result = pd.concat(frames) if frames else pd.DataFrame(columns=["minimum", "maximum"], dtype=float)
+    result = result.reindex([rxn.id for rxn in reactions])
+    result.attrs["unfinished"] = len(reactions) - sum(len(f) for f in frames)
+    return result
+
+
+def deletion_with_deadline(model, items, kind, type="single", deadline=None):
+    """
+    cobra single/double gene or reaction deletions in chunks; the rest get the status "time_limit".
+    """
+    single = single_gene_deletion if kind == "gene" else single_reaction_deletion
+    double = double_gene_deletion if kind == "gene" else double_reaction_deletion
+    items = list(items)
+    frames = []
+    with solver_timeout(model, deadline):
+        for start, chunk in _chunks(items, start=True):
+            if deadline.expired():
+                break
+            if type == "single":
+                frames.append(single(model, chunk, processes=1))
+            else:
+                # each unordered pair once: the chunk against itself and everything after it
+                frames.append(double(model, chunk, items[start:], processes=1))
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["ids", "growth", "status"])
+    result = result[~result["ids"].map(frozenset).duplicated()]
+    if type == "single":
+        expected = [{item.id} for item in items]
+    else:
+        expected = list({frozenset((a.id, b.id)) for a in items for b in items})
+    done = set(result["ids"].map(frozenset))
+    missing = [set(ids) for ids in expected if frozenset(ids) not in done]
+    if missing:
+        result = pd.concat([result, pd.DataFrame({"ids": missing, "growth": np.nan, "status": "time_limit"})],
+                           ignore_index=True)
+    return result.reset_index(drop=True)
+
+
+class SolverPolicy:
+    def __init__(self, manager, profile_path=SOLVER_PROFILE):
+        self.manager = manager
+        self.profile_path = Path(profile_path)
+        self.profile = {}
+        self._copies = {}  # model key -> (revision, backend, model copy)
+        if self.profile_path.exists():
+            with open(self.profile_path, "r", encoding="utf-8") as f:
+                self.profile = json.load(f)
+
+    def candidates(self, analysis, model):
+        backends = []
+        if analysis != "fba" and self.manager.pool_for(model) is not None:
+            backends.append("pool")
+        return backends + installed_backends()
+
+    def choose(self, analysis, model):
+        """
+        The fastest measured backend for this analysis and model size, else the pool, else the
+        model's own solver.
+        """
+        candidates = self.candidates(analysis, model)
+        measured = self.profile.get(analysis, {}).get(size_class(model), {})
+        timed = [b for b in candidates if b in measured]
+        if timed:
+            return min(timed, key=measured.get)
+        return "pool" if "pool" in candidates else interface_name(model)
+
+    def model_for(self, key, model, backend, revision=None):
+        """
+        `model` itself when it already uses `backend`, otherwise a copy switched to it, kept until
+        the model changes. `revision` is the model's revision (default: that of model id `key`).
+        """
+        if interface_name(model) == backend:
+            return model
+        revision = self.manager.get_revision(key) if revision is None else revision
+        cached = self._copies.get(key)
+        if cached and cached[:2] == (revision, backend):
+            return cached[2]
+        copy = model.copy()
+        copy.solver = backend
+        self._copies[key] = (revision, backend, copy)
+        return copy
+
+    def forget(self, model_id):
+        """
+        Drops the copies of a reloaded model and of its reduced model.
+        """
+        self._copies.pop(model_id, None)
+        self._copies.pop(f"{model_id}:compressed", None)
+
+
+def report(backend, deadline, unfinished=0):
+    """
+    What the tools tell the user about how a request was solved.
+    """
+    solver = {"backend": backend, "seconds": round(deadline.elapsed(), 3), "deadline_seconds": deadline.seconds}
+    if unfinished:
+        solver["unfinished"] = int(unfinished)
+        solver["note"] = "The deadline was reached; unfinished entries are empty (FVA, sweep points) or have status 'time_limit'."
+    return solver
+
+
+def _per_lp(fn, lps):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / lps
+
+
+def calibrate(model, pool=None, sample=40):
+    """
+    Seconds per LP of every backend for FBA, FVA and single reaction knockouts on `model`.
+    """
+    reactions = list(model.reactions)[:sample]
+    timings = {analysis: {} for analysis in ANALYSES}
+    for backend in installed_backends():
+        copy = model.copy()
+        copy.solver = backend
+        timings["fba"][backend] = min(_per_lp(copy.slim_optimize, 1) for _ in range(5))
+        timings["fva"][backend] = _per_lp(
+            lambda: flux_variability_analysis(copy, reactions, fraction_of_optimum=1.0, processes=1), 2 * len(reactions))
+        timings["knockout"][backend] = _per_lp(
+            lambda: single_reaction_deletion(copy, reactions, processes=1), len(reactions))
+    if pool is not None and pool.supports(model):
+        pool.fva("calibration", model, reactions[:1])  # exports the model and warms the workers
+        timings["fva"]["pool"] = _per_lp(lambda: pool.fva("calibration", model, reactions), 2 * len(reactions))
+        timings["knockout"]["pool"] = _per_lp(
+            lambda: pool.reaction_deletion("calibration", model, deletion_sets(reactions)), len(reactions))
+        pool.release("calibration")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("calibrate", help="Time every backend on a model and store the results")
+    run.add_argument("model")
+    run.add_argument("--no-pool", action="store_true")
+    sub.add_parser("show", help="Print the stored timings")
+    args = parser.parse_args()
+
+    profile = {}
+    if SOLVER_PROFILE.exists():
+        with open(SOLVER_PROFILE, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    if args.command == "calibrate":
+        model = read_model_file(args.model)
+        pool = None if args.no_pool else SolverPool()
+        try:
+            timings = calibrate(model, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        for analysis, backends in timings.items():
+            profile.setdefault(analysis, {})[size_class(model)] = backends
+        with open(SOLVER_PROFILE, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=1)
+    for analysis, classes in profile.items():
+        for size, backends in classes.items():
+            ranked = ", ".join(f"{b} {t * 1000:.3f} ms" for b, t in sorted(backends.items(), key=lambda x: x[1]))
+            print(f"{analysis:<9} {size:<7} {ranked}")
+
+
+if __name__ == "__main__":
+    main()
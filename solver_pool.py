@@ -0,0 +1,596 @@
+"""
+Persistent LP worker pool owned by `ModelManager`.
+
+cobra's FVA and deletion functions start a new multiprocessing pool on every call and pickle the
+whole model to each worker. Here the workers are started once; the stoichiometric matrix and the
+flux bounds of a model are exported once to shared memory, and every worker builds a resident GLPK
+problem from them the first time it sees the model. Tasks then only carry small deltas: bound
+changes since the export, the objective, the FVA reactions or the reactions to knock out.
+"""
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import get_all_start_methods, get_context, shared_memory
+import atexit
+import itertools
+import math
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import swiglpk as glp
+
+NO_TIME_LIMIT = 2 ** 31 - 1  # GLPK's default tm_lim (ms)
+STATUS = {glp.GLP_OPT: "optimal", glp.GLP_FEAS: "feasible", glp.GLP_INFEAS: "infeasible",
+          glp.GLP_NOFEAS: "infeasible", glp.GLP_UNBND: "unbounded", glp.GLP_UNDEF: "undefined"}
+
+
+def model_arrays(model):
+    """
+    CSR stoichiometric matrix (data, indices, indptr) and flux bounds of a cobra model.
+    """
+    met_index = {met.id: i for i, met in enumerate(model.metabolites)}
+    rows = [[] for _ in met_index]
+    for j, rxn in enumerate(model.reactions):
+        for met, coeff in rxn.metabolites.items():
+            rows[met_index[met.id]].append((j, coeff))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(r) for r in rows])
+    indices = np.fromiter((j for r in rows for j, _ in r), dtype=np.int32, count=indptr[-1])
+    data = np.fromiter((c for r in rows for _, c in r), dtype=np.float64, count=indptr[-1])
+    return {
+        "data": data, "indices": indices, "indptr": indptr,
+        "lb": np.array([rxn.lower_bound for rxn in model.reactions], dtype=np.float64),
+        "ub": np.array([rxn.upper_bound for rxn in model.reactions], dtype=np.float64),
+    }
+
+
+def model_objective(model):
+    """
+    Sparse linear objective (indices, coefficients, direction) in reaction space.
+    """
+    index = {rxn.id: j for j, rxn in enumerate(model.reactions)}
+    terms = {index[rxn.id]: coeff for rxn, coeff in
+             ((r, r.objective_coefficient) for r in model.reactions) if coeff}
+    idx = np.fromiter(terms, dtype=np.int32, count=len(terms))
+    return idx, np.array([terms[i] for i in idx], dtype=np.float64), model.objective_direction
+
+
+class SharedModel:
+    """
+    The arrays of one exported model, each in its own shared memory block.
+    """
+    def __init__(self, key, model):
+        arrays = model_arrays(model)
+        self.key = key
+        # a weak reference, not id(): a freed model's address can be reused by a new one
+        self.model = weakref.ref(model)
+        self.shape = (len(model.reactions), len(model.metabolites))
+        self.futures = set()  # tasks that may still read the shared memory
+        self.lb, self.ub = arrays["lb"], arrays["ub"]
+        self.blocks = []
+        self.spec = {"key": key, "shape": (len(model.metabolites), len(model.reactions)), "arrays": {}}
+        for name, arr in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[:] = arr
+            self.blocks.append(shm)
+            self.spec["arrays"][name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def deltas(self, model):
+        """
+        Bounds that changed since the export, as (indices, lb, ub).
+        """
+        lb = np.array([rxn.lower_bound for rxn in model.reactions], dtype=np.float64)
+        ub = np.array([rxn.upper_bound for rxn in model.reactions], dtype=np.float64)
+        idx = np.flatnonzero((lb != self.lb) | (ub != self.ub)).astype(np.int32)
+        return idx, lb[idx], ub[idx]
+
+    def close(self):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+        self.blocks = []
+
+
+def process_context(preload):
+    """
+    forkserver (with `preload` imported once in the server) where available, otherwise spawn.
+    """
+    if "forkserver" in get_all_start_methods():
+        context = get_context("forkserver")
+        context.set_forkserver_preload(preload)
+        return context
+    return get_context("spawn")
+
+
+# ---- worker side ----
+
+_resident = {}  # model key -> (generation, worker state)
+
+
+def _set_col_bounds(lp, j, lo, hi):
+    lo, hi = float(lo), float(hi)
+    if lo == hi:
+        kind = glp.GLP_FX
+    elif math.isinf(lo) and math.isinf(hi):
+        kind = glp.GLP_FR
+    elif math.isinf(lo):
+        kind = glp.GLP_UP
+    elif math.isinf(hi):
+        kind = glp.GLP_LO
+    else:
+        kind = glp.GLP_DB
+    glp.glp_set_col_bnds(lp, int(j) + 1, kind, 0.0 if math.isinf(lo) else lo, 0.0 if math.isinf(hi) else hi)
+
+
+def _build(spec):
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in spec["arrays"].items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    n_mets, n_rxns = spec["shape"]
+    lp = glp.glp_create_prob()
+    glp.glp_add_rows(lp, n_mets + 1)  # the last row holds the FVA objective constraint
+    for i in range(1, n_mets + 1):
+        glp.glp_set_row_bnds(lp, i, glp.GLP_FX, 0.0, 0.0)
+    glp.glp_set_row_bnds(lp, n_mets + 1, glp.GLP_FR, 0.0, 0.0)
+    glp.glp_add_cols(lp, n_rxns)
+    for j in range(n_rxns):
+        _set_col_bounds(lp, j, arrays["lb"][j], arrays["ub"][j])
+    indptr, indices, data = arrays["indptr"], arrays["indices"], arrays["data"]
+    nnz = int(indptr[-1])
+    ia, ja, ar = glp.intArray(nnz + 1), glp.intArray(nnz + 1), glp.doubleArray(nnz + 1)
+    for i in range(n_mets):
+        for k in range(indptr[i], indptr[i + 1]):
+            ia[k + 1], ja[k + 1], ar[k + 1] = i + 1, int(indices[k]) + 1, float(data[k])
+    glp.glp_load_matrix(lp, nnz, ia, ja, ar)
+    params = glp.glp_smcp()
+    glp.glp_init_smcp(params)
+    params.msg_lev = glp.GLP_MSG_OFF
+    return {"lp": lp, "params": params, "blocks": blocks, "lb": arrays["lb"], "ub": arrays["ub"],
+            "obj_row": n_mets + 1, "changed": np.zeros(0, dtype=np.int32), "objective": np.zeros(0, dtype=np.int32)}
+
+
+def _evict(live):
+    """
+    Frees the resident problems of models that were released or re-exported since.
+    """
+    for key in [k for k, (generation, _) in _resident.items() if live.get(k) != generation]:
+        _release(_resident.pop(key)[1])
+
+
+def _attach(spec, generation):
+    key = spec["key"]
+    _evict(spec["live"])
+    if key in _resident and _resident[key][0] == generation:
+        return _resident[key][1]
+    if key in _resident:
+        _release(_resident.pop(key)[1])
+    state = _build(spec)
+    _resident[key] = (generation, state)
+    return state
+
+
+def _release(state):
+    glp.glp_delete_prob(state["lp"])
+    for shm in state["blocks"]:
+        shm.close()
+
+
+def _apply(state, bounds, objective, deadline=None):
+    """
+    Resets the previous task's bound changes and objective, then applies this task's (and its
+    deadline, a wall-clock time after which no LP is started).
+    """
+    lp = state["lp"]
+    state["deadline"] = deadline
+    for j in state["changed"]:
+        _set_col_bounds(lp, j, state["lb"][j], state["ub"][j])
+    idx, lb, ub = bounds
+    for j, lo, hi in zip(idx, lb, ub):
+        _set_col_bounds(lp, j, lo, hi)
+    state["changed"] = idx
+    state["cur_lb"], state["cur_ub"] = state["lb"].copy(), state["ub"].copy()
+    state["cur_lb"][idx], state["cur_ub"][idx] = lb, ub
+    _set_objective(state, *objective)
+
+
+def _set_objective(state, idx, coeffs, direction):
+    lp = state["lp"]
+    for j in state["objective"]:
+        glp.glp_set_obj_coef(lp, int(j) + 1, 0.0)
+    for j, coeff in zip(idx, coeffs):
+        glp.glp_set_obj_coef(lp, int(j) + 1, float(coeff))
+    glp.glp_set_obj_dir(lp, glp.GLP_MAX if direction == "max" else glp.GLP_MIN)
+    state["objective"] = np.asarray(idx)
+
+
+def _expired(state):
+    return state["deadline"] is not None and time.time() >= state["deadline"]
+
+
+def _solve(state):
+    lp, params = state["lp"], state["params"]
+    params.tm_lim = NO_TIME_LIMIT
+    if state["deadline"] is not None:
+        remaining = state["deadline"] - time.time()
+        if remaining <= 0:
+            return float("nan"), "time_limit"
+        params.tm_lim = max(1, int(remaining * 1000))
+    code = glp.glp_simplex(lp, params)
+    if code not in (0, glp.GLP_ETMLIM):
+        # a stale warm-start basis can make the simplex fail; retry from scratch
+        glp.glp_std_basis(lp)
+        code = glp.glp_simplex(lp, params)
+    if code == glp.GLP_ETMLIM:
+        return float("nan"), "time_limit"
+    status = STATUS.get(glp.glp_get_status(lp), "undefined") if code == 0 else "failed"
+    return (glp.glp_get_obj_val(lp) if status == "optimal" else float("nan")), status
+
+
+def _get_basis(lp):
+    rows = [glp.glp_get_row_stat(lp, i) for i in range(1, glp.glp_get_num_rows(lp) + 1)]
+    return rows, [glp.glp_get_col_stat(lp, j) for j in range(1, glp.glp_get_num_cols(lp) + 1)]
+
+
+def _set_basis(lp, basis):
+    rows, cols = basis
+    for i, stat in enumerate(rows, 1):
+        glp.glp_set_row_stat(lp, i, stat)
+    for j, stat in enumerate(cols, 1):
+        glp.glp_set_col_stat(lp, j, stat)
+
+
+def _knockout_task(spec, generation, bounds, objective, knockouts, deadline=None):
+    """
+    Objective value and status for each set of reaction indices forced to zero flux (stops early
+    at the deadline).
+    """
+    state = _attach(spec, generation)
+    _apply(state, bounds, objective, deadline)
+    lp = state["lp"]
+    basis = None
+    if len(knockouts) > 1:
+        # every knockout starts from the unperturbed optimum; chaining one knockout's basis into
+        # the next costs about three times the pivots
+        _solve(state)
+        basis = _get_basis(lp)
+    results = []
+    for reactions in knockouts:
+        if _expired(state):
+            break
+        for j in reactions:
+            glp.glp_set_col_bnds(lp, int(j) + 1, glp.GLP_FX, 0.0, 0.0)
+        results.append(_solve(state))
+        for j in reactions:
+            _set_col_bounds(lp, j, state["cur_lb"][j], state["cur_ub"][j])
+        if basis is not None:
+            _set_basis(lp, basis)
+    return results
+
+
+def _fva_task(spec, generation, bounds, objective, reactions, objective_bound, deadline=None):
+    """
+    (minimum, maximum) flux of each reaction while the objective stays within its bound (stops
+    early at the deadline).
+    """
+    state = _attach(spec, generation)
+    _apply(state, bounds, objective, deadline)
+    lp, row = state["lp"], state["obj_row"]
+    idx, coeffs, direction = objective
+    n = len(idx)
+    ind, val = glp.intArray(n + 1), glp.doubleArray(n + 1)
+    for k, (j, coeff) in enumerate(zip(idx, coeffs)):
+        ind[k + 1], val[k + 1] = int(j) + 1, float(coeff)
+    glp.glp_set_mat_row(lp, row, n, ind, val)
+    if direction == "max":
+        glp.glp_set_row_bnds(lp, row, glp.GLP_LO, objective_bound, 0.0)
+    else:
+        glp.glp_set_row_bnds(lp, row, glp.GLP_UP, 0.0, objective_bound)
+    results = []
+    try:
+        for j in reactions:
+            if _expired(state):
+                break
+            flux = []
+            for sense in ("min", "max"):
+                _set_objective(state, [j], [1.0], sense)
+                value, status = _solve(state)
+                flux.append(value if status == "optimal" else float("nan"))
+            results.append(tuple(flux))
+    finally:
+        glp.glp_set_mat_row(lp, row, 0, None, None)
+        glp.glp_set_row_bnds(lp, row, glp.GLP_FR, 0.0, 0.0)
+    return results
+
+
+def _blocked_task(spec, generation, bounds, objective, reactions, tolerance):
+    """
+    The reactions that cannot carry flux. Every solution's flux vector rules out all reactions it
+    uses, so most reactions never need their own LPs.
+    """
+    state = _attach(spec, generation)
+    _apply(state, bounds, objective)
+    lp = state["lp"]
+    n = spec["shape"][1]
+    carries = np.zeros(n, dtype=bool)
+    blocked = []
+    for j in reactions:
+        if carries[j]:
+            continue
+        for sense in ("max", "min"):
+            _set_objective(state, [j], [1.0], sense)
+            value, status = _solve(state)
+            if status != "optimal":
+                # unbounded, failed or out of time: only an optimum of zero proves a reaction blocked
+                carries[j] = True
+                break
+            flux = np.fromiter((glp.glp_get_col_prim(lp, k + 1) for k in range(n)), dtype=np.float64, count=n)
+            carries |= np.abs(flux) > tolerance
+            if carries[j]:
+                break
+        else:
+            blocked.append(j)
+    return blocked
+
+
+def parameter_bounds(lb, ub, bound, value):
+    """
+    Reaction bounds with one of them (or both, for "fixed") set to a swept value.
+    """
+    if bound == "lower":
+        return value, ub
+    if bound == "upper":
+        return lb, value
+    return value, value
+
+
+def _sweep_task(spec, generation, bounds, objective, rows, parameters, columns, channels, deadline=None):
+    """
+    Channel values over grid rows, with the number of points left unsolved at the deadline. Only
+    the swept bounds change between consecutive LPs, so each solve starts from the previous optimal
+    basis; every other row is walked backwards so the next row starts next to where the last one ended.
+    """
+    state = _attach(spec, generation)
+    _apply(state, bounds, objective, deadline)
+    lp = state["lp"]
+    cur_lb, cur_ub = state["cur_lb"], state["cur_ub"]
+    results = []
+    try:
+        for n, (i, value) in enumerate(rows):
+            if _expired(state):
+                break
+            j, bound = parameters[0]
+            row_bounds = parameter_bounds(cur_lb[j], cur_ub[j], bound, value)
+            order = list(range(len(columns))) if columns is not None else [None]
+            if n % 2:
+                order.reverse()
+            values = np.full((len(order), len(channels)), np.nan, dtype=np.float32)
+            unfinished = 0
+            for k in order:
+                point = {j: row_bounds}
+                if k is not None:
+                    j2, bound2 = parameters[1]
+                    point[j2] = parameter_bounds(cur_lb[j2], cur_ub[j2], bound2, columns[k])
+                if any(lo > hi for lo, hi in point.values()):
+                    continue  # an empty flux range: infeasible without solving
+                for col, (lo, hi) in point.items():
+                    _set_col_bounds(lp, col, lo, hi)
+                for c, channel in enumerate(channels):
+                    _set_objective(state, *channel)
+                    value_c, status = _solve(state)
+                    values[k or 0, c] = value_c if status == "optimal" else np.nan
+                unfinished += status == "time_limit"
+            results.append((i, values, unfinished))
+    finally:
+        for j, _ in parameters:
+            _set_col_bounds(lp, j, cur_lb[j], cur_ub[j])
+    return results
+
+
+def _ping():
+    return os.getpid()
+
+
+# ---- parent side ----
+
+class SolverPool:
+    """
+    Worker processes with resident GLPK problems for the models owned by a `ModelManager`.
+    """
+    def __init__(self, processes=None):
+        self.processes = processes or int(os.environ.get("SOLVER_POOL_PROCESSES", 0)) or os.cpu_count() or 1
+        self._executor = None
+        self._shared = {}  # model key -> SharedModel
+        self._generation = itertools.count(1)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            # workers are forked from a clean server process that only imported this module, so they
+            # neither inherit the web server's threads and models nor re-import its __main__
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=process_context(["solver_pool"]))
+            atexit.register(self.shutdown)
+        return self._executor
+
+    def warm(self):
+        """
+        Starts every worker process ahead of the first analysis.
+        """
+        pool = self._pool()
+        return sorted({f.result() for f in [pool.submit(_ping) for _ in range(self.processes)]})
+
+    @staticmethod
+    def supports(model):
+        """
+        Only plain stoichiometric LPs are handled here; models with extra variables or constraints
+        (or a non-reaction objective) stay on cobra.
+        """
+        return (len(model.solver.constraints) == len(model.metabolites)
+                and len(model.solver.variables) == 2 * len(model.reactions)
+                and any(rxn.objective_coefficient for rxn in model.reactions))
+
+    def _export(self, key, model):
+        # called with the lock held
+        shared = self._shared.get(key)
+        if shared is None or shared.model() is not model or shared.shape != (len(model.reactions), len(model.metabolites)):
+            if shared is not None:
+                self._close(shared)
+            shared = self._shared[key] = SharedModel(key, model)
+            self._generations[key] = next(self._generation)
+        return shared, self._generations[key]
+
+    @staticmethod
+    def _close(shared):
+        # tasks already queued still read the old export
+        wait(shared.futures.copy())
+        shared.close()
+
+    def release(self, key):
+        """
+        Unlinks a model's shared memory once its queued tasks are done and tells the workers to free
+        its resident problem (workers also drop it with their next task).
+        """
+        with self._lock:
+            shared = self._shared.pop(key, None)
+            self._generations.pop(key, None)
+            live = dict(self._generations)
+        if shared is None:
+            return
+        self._close(shared)
+        if self._executor is not None:
+            for _ in range(self.processes):
+                self._executor.submit(_evict, live)
+
+    def _chunks(self, items):
+        size = max(1, math.ceil(len(items) / (self.processes * 2)))
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _run(self, key, model, task, items, *args, objective=None, deadline=None):
+        pool = self._pool()
+        chunks = self._chunks(items)
+        kwargs = {} if deadline is None else {"deadline": deadline}
+        with self._lock:
+            # exported and submitted together, so a concurrent release waits for these tasks
+            shared, generation = self._export(key, model)
+            bounds, objective = shared.deltas(model), objective or model_objective(model)
+            spec = {**shared.spec, "live": dict(self._generations)}
+            futures = [pool.submit(task, spec, generation, bounds, objective, chunk, *args, **kwargs)
+                       for chunk in chunks]
+            shared.futures.update(futures)
+        for f in futures:
+            f.add_done_callback(shared.futures.discard)
+        if deadline is None:
+            return [row for f in futures for row in f.result()]
+        # tasks stop at the deadline; the items they did not reach come back as None
+        return [row for f, chunk in zip(futures, chunks)
+                for row in itertools.islice(itertools.chain(f.result(), itertools.repeat(None)), len(chunk))]
+
+    def optimize(self, key, model, deadline=None):
+        return self._run(key, model, _knockout_task, [[]], deadline=deadline)[0] or (float("nan"), "time_limit")
+
+    def knockouts(self, key, model, knockout_sets, deadline=None):
+        """
+        Objective value and status for each list of reaction indices knocked out; sets not reached
+        before the deadline get the status "time_limit".
+        """
+        results = self._run(key, model, _knockout_task, [np.asarray(k, dtype=np.int32) for k in knockout_sets],
+                            deadline=deadline)
+        return [row or (float("nan"), "time_limit") for row in results]
+
+    def fva(self, key, model, reactions, fraction_of_optimum=1.0, deadline=None):
+        """
+        Same table as cobra's flux_variability_analysis (index: reaction ids; minimum, maximum).
+        Reactions not reached before the deadline are NaN and counted in `attrs["unfinished"]`.
+        """
+        optimum, status = self.optimize(key, model, deadline)
+        if status != "optimal":
+            raise ValueError(f"The model is {status}; FVA needs an optimal reference solution.")
+        index = {rxn.id: j for j, rxn in enumerate(model.reactions)}
+        flux = self._run(key, model, _fva_task, [index[rxn.id] for rxn in reactions],
+                         fraction_of_optimum * optimum, deadline=deadline)
+        result = pd.DataFrame([row or (np.nan, np.nan) for row in flux], index=[rxn.id for rxn in reactions],
+                              columns=["minimum", "maximum"])
+        result.attrs["unfinished"] = sum(row is None for row in flux)
+        return result
+
+    def blocked(self, key, model, tolerance=1e-9):
+        """
+        Ids of the reactions that cannot carry flux under the current bounds.
+        """
+        no_objective = (np.zeros(0, dtype=np.int32), np.zeros(0), "max")
+        blocked = self._run(key, model, _blocked_task, list(range(len(model.reactions))), tolerance,
+                            objective=no_objective)
+        return {model.reactions[j].id for j in blocked}
+
+    def sweep(self, key, model, parameters, axes, channels, deadline=None):
+        """
+        Channel values (e.g. the objective) over a grid of reaction bounds, as a float32 array of
+        shape (len(axes[0]), [len(axes[1]),] len(channels)), and the number of grid points not
+        solved before the deadline (NaN, like infeasible ones). `parameters` are (reaction id,
+        bound) pairs, one per axis; grid rows are spread over the workers.
+        """
+        index = {rxn.id: j for j, rxn in enumerate(model.reactions)}
+        params = [(index[rxn_id], bound) for rxn_id, bound in parameters]
+        columns = np.asarray(axes[1], dtype=np.float64) if len(axes) > 1 else None
+        rows = self._run(key, model, _sweep_task, list(enumerate(np.asarray(axes[0], dtype=np.float64))),
+                         params, columns, channels, deadline=deadline)
+        surface = np.full(tuple(len(a) for a in axes) + (len(channels),), np.nan, dtype=np.float32)
+        row_points = len(columns) if columns is not None else 1
+        unfinished = 0
+        for row in rows:
+            if row is None:
+                unfinished += row_points
+                continue
+            i, values, row_unfinished = row
+            surface[i] = values if columns is not None else values[0]
+            unfinished += row_unfinished
+        return surface, unfinished
+
+    def deletion_table(self, key, model, labels, knockouts, deadline=None):
+        """
+        Same table as cobra's deletion functions (ids, growth, status): one row per label and
+        list of reaction indices to knock out.
+        """
+        results = self.knockouts(key, model, knockouts, deadline)
+        return pd.DataFrame({"ids": labels,
+                             "growth": [growth for growth, _ in results],
+                             "status": [status for _, status in results]})
+
+    def gene_deletion(self, key, model, gene_sets, deadline=None):
+        index = {rxn.id: j for j, rxn in enumerate(model.reactions)}
+        knockouts = [[index[r] for r in knocked_reactions(genes)] for genes in gene_sets]
+        return self.deletion_table(key, model, [{g.id for g in genes} for genes in gene_sets], knockouts, deadline)
+
+    def reaction_deletion(self, key, model, reaction_sets, deadline=None):
+        index = {rxn.id: j for j, rxn in enumerate(model.reactions)}
+        knockouts = [[index[r.id] for r in rxns] for rxns in reaction_sets]
+        return self.deletion_table(key, model, [{r.id for r in rxns} for rxns in reaction_sets], knockouts, deadline)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        for key in list(self._shared):
+            self.release(key)
+
+
+def knocked_reactions(genes):
+    """
+    Ids of the reactions whose gene-reaction rule fails when all the given genes are knocked out.
+    """
+    ids = {gene.id for gene in genes}
+    return {rxn.id for gene in genes for rxn in gene.reactions if not rxn.gpr.eval(ids)}
+
+
+def deletion_sets(items, type="single"):
+    """
+    Single items, or every unordered pair (including an item with itself) as cobra's double deletions do.
+    """
+    if type == "single":
+        return [[item] for item in items]
+    pairs = {frozenset((a.id, b.id)): [a] if a is b else [a, b] for a in items for b in items}
+    return list(pairs.values())
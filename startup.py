@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+import time
+import os
+import psutil
+
+STARTUP_PHASES = []
+_process = psutil.Process(os.getpid())
+_started = time.perf_counter()
+
+
+def _rss_mb():
+    return _process.memory_info().rss / 1e6
+
+
+@contextmanager
+def phase(name):
+    """
+    Records wall time and RSS growth of a startup phase (imports, provider loading, agent build).
+    """
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PHASES.append({
+            "phase": name,
+            "seconds": round(time.perf_counter() - start, 4),
+            "rss_mb_delta": round(_rss_mb() - rss_before, 2),
+        })
+
+
+def startup_report():
+    """
+    Returns the cost of every recorded phase, including providers loaded lazily after startup.
+    """
+    return {
+        "phases": STARTUP_PHASES,
+        "total_seconds": round(sum(p["seconds"] for p in STARTUP_PHASES), 4),
+        "uptime_seconds": round(time.perf_counter() - _started, 2),
+        "rss_mb": round(_rss_mb(), 2),
+    }
+
+
+def print_startup_report():
+    report = startup_report()
+    for p in report["phases"]:
+        print(f"[startup] {p['phase']:<28} {p['seconds']:>8.3f}s {p['rss_mb_delta']:>+9.1f} MB")
+    print(f"[startup] {'total':<28} {report['total_seconds']:>8.3f}s {report['rss_mb']:>9.1f} MB RSS")
@@ -0,0 +1,66 @@
+import functools
+import json
+import queue
+import threading
+import time
+
+# Each streaming request runs its pipeline in its own thread; events go to that thread's sink
+_local = threading.local()
+
+
+def emit(event, **data):
+    """
+    Sends an event to the stream of the current request. Does nothing outside a stream.
+    """
+    sink = getattr(_local, "sink", None)
+    if sink is not None:
+        sink.put({"event": event, "time": round(time.perf_counter() - _local.started, 4), **data})
+
+
+def tool_events(fn):
+    """
+    Emits `tool_start`/`tool_end` events (with timings) around a tool function.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        emit("tool_start", tool=fn.__name__, args=kwargs)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            emit("tool_end", tool=fn.__name__, seconds=round(time.perf_counter() - start, 4), ok=False, error=str(e))
+            raise
+        ok = not (isinstance(result, dict) and "error" in result)
+        emit("tool_end", tool=fn.__name__, seconds=round(time.perf_counter() - start, 4), ok=ok)
+        return result
+    return wrapper
+
+
+def format_sse(item):
+    return f"event: {item['event']}\ndata: {json.dumps(item, default=str)}\n\n"
+
+
+def stream_events(producer, *args, **kwargs):
+    """
+    Runs `producer` in a background thread and yields its events as Server-Sent Events
+    as soon as they are emitted. The stream always ends with a `done` or `error` event.
+    """
+    events = queue.Queue()
+
+    def run():
+        _local.sink = events
+        _local.started = time.perf_counter()
+        try:
+            producer(*args, **kwargs)
+        except Exception as e:
+            emit("error", detail=str(e))
+        finally:
+            _local.sink = None
+            events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+    while True:
+        item = events.get()
+        if item is None:
+            break
+        yield format_sse(item)
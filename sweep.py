@@ -0,0 +1,128 @@
+"""
+Parametric sweeps: the objective, or the feasible range of a target flux, over a 1-D or 2-D grid
+of reaction bounds (robustness analysis, phenotype phase planes, production envelopes).
+
+Each grid row is solved in order, changing only the swept bounds between LPs so every solve
+starts from the previous optimal basis; rows are spread over the solver pool. The surface is
+saved as one float32 .npy array (grid axes first, then the channels) next to a small JSON
+description of its axes.
+"""
+from pathlib import Path
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+from solver_policy import solver_timeout
+from solver_pool import model_objective, parameter_bounds
+
+BOUNDS = ("lower", "upper", "fixed")
+MAX_STEPS = 201
+PREVIEW_SIZE = 5
+SWEEP_DIR = Path("outputs/sweeps")
+
+_copies = {}  # model key -> (revision, private copy, lock)
+_copies_lock = threading.Lock()
+
+
+def grid_axes(start, stop, steps):
+    """
+    Evenly spaced values for each swept reaction.
+    """
+    if not 2 <= steps <= MAX_STEPS:
+        raise ValueError(f"steps must be between 2 and {MAX_STEPS}.")
+    return [np.linspace(a, b, steps) for a, b in zip(start, stop)]
+
+
+def sweep_channels(model, target=None):
+    """
+    What is solved at every grid point: the model's objective, or the minimum and maximum flux of
+    a target reaction (a production envelope).
+    """
+    if target is None:
+        return ["objective"], [model_objective(model)]
+    j = np.array([model.reactions.index(target)], dtype=np.int32)
+    ones = np.ones(1)
+    return ["minimum", "maximum"], [(j, ones, "min"), (j, ones, "max")]
+
+
+def private_copy(key, model, revision):
+    """
+    A copy of `model` for cobra sweeps to change, made once per revision, and its lock.
+    """
+    with _copies_lock:
+        cached = _copies.get(key)
+        if cached is None or cached[0] != revision:
+            cached = _copies[key] = (revision, model.copy(), threading.Lock())
+        return cached[1:]
+
+
+def sweep_cobra(model, parameters, axes, deadline, target=None, lock=None):
+    """
+    The same surface as `SolverPool.sweep` (and unsolved point count), solved in order on `model`,
+    a private copy whose bounds and objective are restored afterwards.
+    """
+    with lock or threading.Lock(), model, solver_timeout(model, deadline):
+        reactions = [model.reactions.get_by_id(rxn_id) for rxn_id, _ in parameters]
+        base = [rxn.bounds for rxn in reactions]
+        senses = [model.objective_direction] if target is None else ["min", "max"]
+        if target is not None:
+            model.objective = model.reactions.get_by_id(target)
+        surface = np.full(tuple(len(a) for a in axes) + (len(senses),), np.nan, dtype=np.float32)
+        unfinished = 0
+        for index in np.ndindex(*surface.shape[:-1]):
+            if deadline.expired():
+                unfinished += 1
+                continue
+            point = [parameter_bounds(*base[d], parameters[d][1], axes[d][i]) for d, i in enumerate(index)]
+            if any(lo > hi for lo, hi in point):
+                continue
+            for rxn, (lo, hi) in zip(reactions, point):
+                rxn.bounds = (lo, hi)
+            for c, sense in enumerate(senses):
+                model.objective_direction = sense
+                surface[index + (c,)] = model.slim_optimize(error_value=np.nan)
+            unfinished += model.solver.status == "time_limit"
+    return surface, unfinished
+
+
+def save_surface(surface, parameters, axes, channels, target=None):
+    SWEEP_DIR.mkdir(parents=True, exist_ok=True)
+    name = "sweep_" + "_".join(rxn_id for rxn_id, _ in parameters) + time.strftime("_%Y%m%d_%H%M%S")
+    path = SWEEP_DIR / f"{name}.npy"
+    np.save(path, surface)
+    with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump({"shape": list(surface.shape), "dtype": str(surface.dtype), "target": target,
+                   "axes": [{"reaction": rxn_id, "bound": bound, "values": a.tolist()}
+                            for (rxn_id, bound), a in zip(parameters, axes)],
+                   "channels": channels}, f, indent=1)
+    return str(path)
+
+
+def _value(x):
+    return None if math.isnan(x) else round(float(x), 6)
+
+
+def preview(surface, parameters, axes, channels, unfinished=0, size=PREVIEW_SIZE):
+    """
+    A few evenly spaced grid points, the range of every channel and where the last channel peaks
+    (`unfinished` points are NaN but not counted as infeasible).
+    """
+    picks = [np.unique(np.linspace(0, len(a) - 1, min(size, len(a))).round().astype(int)) for a in axes]
+    points = []
+    for index in np.ndindex(*(len(p) for p in picks)):
+        grid_index = tuple(p[i] for p, i in zip(picks, index))
+        point = {rxn_id: round(float(axes[d][grid_index[d]]), 6) for d, (rxn_id, _) in enumerate(parameters)}
+        point.update({name: _value(surface[grid_index + (c,)]) for c, name in enumerate(channels)})
+        points.append(point)
+    summary = {"shape": list(surface.shape[:-1]), "channels": channels,
+               "infeasible_points": int(np.isnan(surface[..., -1]).sum()) - unfinished, "preview": points}
+    feasible = ~np.isnan(surface[..., -1])
+    if feasible.any():
+        for c, name in enumerate(channels):
+            summary[f"{name}_range"] = [_value(np.nanmin(surface[..., c])), _value(np.nanmax(surface[..., c]))]
+        peak = np.unravel_index(np.nanargmax(surface[..., -1]), surface.shape[:-1])
+        summary["peak"] = {rxn_id: round(float(axes[d][peak[d]]), 6) for d, (rxn_id, _) in enumerate(parameters)}
+    return summary
@@ -1,11 +1,21 @@
 from llama_index.core.tools import FunctionTool
-from cobra.flux_analysis import flux_variability_analysis
-from cobra.flux_analysis import single_gene_deletion, double_gene_deletion, single_reaction_deletion, double_reaction_deletion
+from cobra import flux_analysis
+from cobra.exceptions import OptimizationError
 from models import ModelManager
+from solver_pool import deletion_sets
+from precompute import gene_deletion_table, essential_genes
+from screening import ANALYSES, check_directory, run_screen
+from model_library import UPLOAD_DIR
+from solver_policy import Deadline, solver_timeout, interface_name, fva_with_deadline, deletion_with_deadline, report
+from deletion_screen import screen_reactions
+from sweep import BOUNDS, grid_axes, sweep_channels, private_copy, sweep_cobra, save_surface, preview
 from cobra.sampling import OptGPSampler, ACHRSampler
 import multiprocessing
 import psutil
 from ptypes import LoadModelInput
+from streaming import tool_events
+from metrics import span, traced
+import numpy as np
 import pandas as pd
 import os
 
@@ -15,6 +25,16 @@ def set_model_manager(manager):
     global model_manager
     model_manager = manager
 
+def write_csv(df, path):
+    """
+    Writes a result table to CSV, recording the time and bytes written.
+    """
+    with span("io", "write_csv") as info:
+        df.to_csv(path, index=False)
+        info["bytes_written"] = os.path.getsize(path)
+
+@tool_events
+@traced("tool")
 def get_current_model_id() -> str:
     """
     Returns the current model ID from the ModelManager.
@@ -24,6 +44,8 @@ def get_current_model_id() -> str:
         return {"error": "No model is currently loaded. Please load a model first."}
     
     return {"model_id": model_manager.current_model_id}
+@tool_events
+@traced("tool")
 def check_model_loaded():
     """
     Checks if a model is currently loaded in the ModelManager.
@@ -32,73 +54,73 @@ def check_model_loaded():
     if not model_manager or not model_manager.current_model_id:
         return {"error" : "No model is currently loaded. Please load a model first."}
     return {"response": "Model is loaded", "model_id": model_manager.current_model_id}
+@tool_events
+@traced("tool")
 def load_model(model_id: str) -> str:
     """
     Loads a model by its ID from the ModelManager.
     This function simulates fetching a model from a database or API.
     """
     try:
-        model_manager.load_model_by_id(model_id)
-        return {"response": f"Model {model_id} loaded successfully.", "model_id": model_id}
+        result = model_manager.load_model_by_id(model_id)
+        if not isinstance(result, str):
+            return {"error": (result or {}).get("response", f"Model {model_id} could not be loaded.")}
+        return {"response": f"Model {model_id} loaded successfully.", "model_id": result}
     except Exception as e:
         return {"error" : str(e)}
+@tool_events
+@traced("tool")
+def search_model_library(query: str, limit: int = 10) -> dict:
+    """
+    Searches the local model library by model ID, name or organism.
+    """
+    try:
+        hits = model_manager.library.search(query, limit)
+        if not hits:
+            return {"response": f"No models matching '{query}' in the local library."}
+        return {"models": [
+            {k: e[k] for k in ("id", "name", "organism", "reactions", "metabolites", "genes")} for e in hits
+        ]}
+    except Exception as e:
+        return {"error": str(e)}
+@tool_events
+@traced("tool")
 def model_data() -> dict:
     """
     Returns metadata for a given a model.
     This function simulates fetching metadata from a database or API.
     """
     try:
-        model = model_manager.get_current_model()
-
-        for rxn in model.reactions:
-            if rxn.lower_bound is None:
-                rxn.lower_bound = -1000.0
-            if rxn.upper_bound is None:
-                rxn.upper_bound = 1000.0
-
-        data = {
-            "model_id": str(model.id),
-            "objective_reaction": str(model.objective.expression) if model.objective.expression else "Not Set Yet",
-            "reactions_count": len(model.reactions),
-            "metabolites_count": len(model.metabolites),
-            "genes_count": len(model.genes),
-            "groups_count": len(model.groups),
-            "compartments_count": len(model.compartments),
-            "Compartments": str([v for k,v in model.compartments.items()]),
-        }
-        return data
+        summary = model_manager.get_summary()
+        if summary is None:
+            return {"error": "No model is currently loaded.", "model_id": model_manager.current_model_id}
+        return dict(summary.data)
 
     except Exception as e:
         return {
             "error": str(e),
             "model_id": model_manager.current_model_id
         }
-def model_info(query: str, count=10) -> dict:
+@tool_events
+@traced("tool")
+def model_info(query: str, count=10, offset=0) -> dict:
     """
     Returns specific information for a given model based on a query.
     """
-    try:
-        model = model_manager.get_current_model()
-    except:
+    summary = model_manager.get_summary()
+    if summary is None:
         return {
             "error": f"No Model is found.",
         }
     try:
-        if query == "reactions":
-            return {"reactions" : [rxn.name for rxn in model.reactions][:count]}
-        elif query == "genes":
-            return {"genes" : [gn.name for gn in model.genes][:count]}
-        elif query == "metabolites":
-            return {"metabolites" : [mb.name for mb in model.metabolites][:count]}
-        else:
-            return {
-                "error": f"Unknown query: {query}",
-            }
+        return {query: summary.page(query, int(offset), int(count))}
     except Exception as e:
         return {
             "error": str(e),
             "model_id": model_manager.current_model_id
         }
+@tool_events
+@traced("tool")
 def reaction_info(rxn_name: str) -> dict:
     """
     Returns information about a specific reaction in the model.
@@ -120,6 +142,8 @@ def reaction_info(rxn_name: str) -> dict:
         }
     except Exception as e:
         return {"error": str(e)}
+@tool_events
+@traced("tool")
 def metabolite_info(mb_id: str) -> dict:
     """
     Returns information about a specific metabolite in the model.
@@ -137,6 +161,8 @@ def metabolite_info(mb_id: str) -> dict:
         }
     except Exception as e:
         return {"error": str(e)}
+@tool_events
+@traced("tool")
 def gene_info(gn_id: str) -> dict:
     """
     Returns information about a specific reaction in the model.
@@ -153,10 +179,12 @@ def gene_info(gn_id: str) -> dict:
         }
     except Exception as e:
         return {"error": str(e)}
-def run_fba() -> str:
+@tool_events
+@traced("tool")
+def run_fba(deadline: float = None, pfba: bool = False) -> str:
     """
-    Performs Flux Balance Analysis (FBA) on the current metabolic model.
-    Returns Objective value and Model Status.
+    Performs Flux Balance Analysis (FBA) on the current metabolic model, or parsimonious FBA
+    with `pfba`. Returns Objective value, Model Status and the id of the stored flux run.
     """
     model = model_manager.get_current_model()
     bounds = model_manager.bounds_data
@@ -166,18 +194,68 @@ def run_fba() -> str:
     if not model_manager.objective:
         return {"error": "No Objective Function is set for the model."}
     try:
-        for rxn_id, lval, uval in bounds:
-            if rxn_id in model.reactions:
-                model.reactions.get_by_id(rxn_id).bounds = (lval, uval)
+        with span("model", "apply_bounds"):
+            model_manager.set_bounds(bounds)
     except:
         return {"error": "Wrong Reaction bounds given."}
     
-    solution = model.optimize()
-    model_manager.objective = solution.objective_value
-    return {
-        "Objective value" : str(solution.objective_value),
+    deadline = Deadline(deadline)
+    summary = model_manager.get_summary()
+    precomputed = None if pfba else model_manager.precompute.get("fba")
+    if precomputed:
+        run = model_manager.fluxes.add(model_manager.current_model_id, summary, precomputed["fluxes"], "fba",
+                                       precomputed["objective_value"], precomputed["status"])
+        model_manager.objective = precomputed["objective_value"]
+        return {
+            "Objective value" : str(precomputed["objective_value"]),
+            "status" : str(precomputed["status"]),
+            "run_id": run["run_id"],
+            "solver": report("precomputed", deadline),
+        }
+    backend = model_manager.policy.choose("fba", model)
+    target = model_manager.policy.model_for(model_manager.current_model_id, model, backend)
+    method = "pfba" if pfba else "fba"
+    with span("solver", method, lp_count=2 if pfba else 1, backend=backend), solver_timeout(target, deadline):
+        if pfba:
+            try:
+                solution = flux_analysis.pfba(target)
+            except OptimizationError:
+                # infeasible, unbounded or out of time; report the status like FBA does, with no run
+                return {
+                    "Objective value": str(float("nan")),
+                    "status": str(target.solver.status),
+                    "solver": report(backend, deadline),
+                }
+            # pFBA minimises total flux; report the original objective at that optimum
+            objective_value = sum(rxn.objective_coefficient * solution.fluxes[rxn.id]
+                                  for rxn in target.reactions if rxn.objective_coefficient)
+        else:
+            solution = target.optimize(raise_error=False)
+            objective_value = solution.objective_value
+    model_manager.objective = objective_value
+    result = {
+        "Objective value" : str(objective_value),
         "status" : str(solution.status),
+        "solver": report(backend, deadline),
     }
+    if solution.status == "optimal":
+        run = model_manager.fluxes.add(model_manager.current_model_id, summary, solution.fluxes, method,
+                                       objective_value, solution.status)
+        result["run_id"] = run["run_id"]
+    return result
+@tool_events
+@traced("tool")
+def compare_flux_runs(run_a: int = None, run_b: int = None, top_k: int = 10) -> dict:
+    """
+    Lists the reactions whose flux changed most between two stored FBA/pFBA runs (default: the last two).
+    """
+    try:
+        with span("model", "flux_diff"):
+            return model_manager.fluxes.diff(model_manager.current_model_id, run_a, run_b, top_k)
+    except (KeyError, ValueError) as e:
+        return {"error": str(e).strip("'"), "runs": model_manager.fluxes.runs(model_manager.current_model_id)}
+@tool_events
+@traced("tool")
 def set_model_objective(objective_dict, direction="max"):
     """
     Sets the objective on the current model.
@@ -185,15 +263,10 @@ def set_model_objective(objective_dict, direction="max"):
     try:
         model = model_manager.get_current_model()
 
-        cleaned_objective = {}
-        for rxn_id, coeff in dict(objective_dict).items():
+        for rxn_id in dict(objective_dict):
             if rxn_id not in model.reactions:
                 return {"error": f"Reaction '{rxn_id}' not found in model."}
-            rxn_obj = model.reactions.get_by_id(rxn_id)
-            cleaned_objective[rxn_obj] = float(coeff)
-
-        model.objective = cleaned_objective
-        model.objective.direction = direction.lower()
+        model_manager.set_objective(dict(objective_dict), direction)
 
         return {
             "status": "Objective set successfully.",
@@ -203,7 +276,9 @@ def set_model_objective(objective_dict, direction="max"):
 
     except Exception as e:
         return {"error" : str(e)}  
-def run_fva(rxn_names, fraction_of_optimum=0.9):
+@tool_events
+@traced("tool")
+def run_fva(rxn_names, fraction_of_optimum=0.9, deadline=None):
     """
     Runs Flux Variability Analysis (FVA) on the model given a Reaction List and a Fraction of Optimum (FO) Value.    
     """
@@ -223,53 +298,92 @@ def run_fva(rxn_names, fraction_of_optimum=0.9):
                 raise ValueError(f"Reaction name '{name}' not found in model.")
             rxn_obj_list.append(match)
 
-        fva_result = flux_variability_analysis(model, rxn_obj_list, fraction_of_optimum=fraction_of_optimum)
-
-        fva_df = fva_result.reset_index()
+        deadline = Deadline(deadline)
+        pool = model_manager.pool_for(model)
+        compressed = model_manager.get_compressed()
+        key, target, targets = model_manager.current_model_id, model, rxn_obj_list
+        if compressed:
+            # solve only the kept reactions of the reduced model, then map back to the requested ones
+            key, target, targets = compressed.key, compressed.model, compressed.reactions_for(rxn_obj_list)
+        backend = model_manager.policy.choose("fva", target)
+        with span("solver", "fva", lp_count=2 * len(targets) + 1, backend=backend, compressed=bool(compressed)):
+            if not targets:
+                fva_result = pd.DataFrame(columns=["minimum", "maximum"], dtype=float)
+            elif backend == "pool":
+                fva_result = pool.fva(key, target, targets, fraction_of_optimum, deadline.at)
+            else:
+                revision = compressed.revision if compressed else model_manager.get_revision()
+                fva_result = fva_with_deadline(model_manager.policy.model_for(key, target, backend, revision),
+                                               targets, fraction_of_optimum, deadline)
+        solver = report(backend, deadline, fva_result.attrs.get("unfinished", 0))
+        if compressed:
+            fva_result = compressed.expand_fva(fva_result, [rxn.id for rxn in rxn_obj_list])
+
+        fva_df = fva_result[["minimum", "maximum"]].reset_index()
         fva_df.insert(0, "Reaction Name", [rxn.name for rxn in rxn_obj_list])
-        fva_df.columns = ["Reaction Name", "Reaction ID", "Maximum Flux", "Minimum Flux"]
+        fva_df.columns = ["Reaction Name", "Reaction ID", "Minimum Flux", "Maximum Flux"]
 
         if len(fva_df) > 5:
             output_dir = os.path.join(os.getcwd(), 'outputs/fva')
             os.makedirs(output_dir, exist_ok=True)
             csv_path = os.path.join(output_dir, f"fva_result.csv")
-            fva_df.to_csv(csv_path, index=False)
+            write_csv(fva_df, csv_path)
 
             return {
                 "fraction_of_optimum": fraction_of_optimum,
                 "fva_output": f"First 5 rows: {fva_df.iloc[:5,:].to_dict(orient='records')}",
-                "message": f"FVA result has {len(fva_df)} entries, saved to {csv_path} as CSV file."
+                "message": f"FVA result has {len(fva_df)} entries, saved to {csv_path} as CSV file.",
+                "solver": solver,
             }
         else:
             return {
                 "fraction_of_optimum": fraction_of_optimum,
-                "fva_output": fva_df.to_dict(orient="records")
+                "fva_output": fva_df.to_dict(orient="records"),
+                "solver": solver,
             }
 
     except Exception as e:
         return {"error": str(e)}
-def gene_knockout_simulation(gene_names: list[str], type: str = "single") -> dict:
+@tool_events
+@traced("tool")
+def gene_knockout_simulation(gene_names: list[str], type: str = "single", deadline: float = None) -> dict:
     """
     Performs single or double gene knockout simulations on the loaded metabolic model.
     """
     try:
         model = model_manager.get_current_model()
-        valid_genes = []
-        seen = set()
-        for gene in model.genes:
-            if gene.name in gene_names and gene.id not in seen:
-                valid_genes.append(gene)
-                seen.add(gene.id)
+        valid_genes = [model.genes[i] for i in model_manager.get_summary().find("genes", gene_names)]
 
         if not valid_genes:
             return {"error": "None of the provided genes are valid in this model."}
 
-        if type == "single":
-            result = single_gene_deletion(model, gene_list=valid_genes)
-        elif type == "double":
-            result = double_gene_deletion(model, gene_list=valid_genes)
-        else:
+        if type not in ("single", "double"):
             return {"error": "Invalid type. Choose 'single' or 'double'."}
+        deadline = Deadline(deadline)
+        pool = model_manager.pool_for(model)
+        precomputed = model_manager.precompute.get("gene_deletion") if type == "single" else None
+        if precomputed is not None and not all(g.id in precomputed.index for g in valid_genes):
+            precomputed = None
+        backend = "precomputed" if precomputed is not None else model_manager.policy.choose("knockout", model)
+        with span("solver", f"{type}_gene_deletion", backend=backend) as info:
+            compressed = model_manager.get_compressed() if backend == "pool" else None
+            if precomputed is not None:
+                rows = precomputed.loc[[g.id for g in valid_genes]]
+                result = pd.DataFrame({"ids": [{g.id} for g in valid_genes],
+                                       "growth": rows["growth"].to_numpy(), "status": rows["status"].to_numpy()})
+            elif compressed:
+                sets = deletion_sets(valid_genes, type)
+                result = pool.deletion_table(compressed.key, compressed.model, [{g.id for g in genes} for genes in sets],
+                                             compressed.gene_knockouts(sets), deadline.at)
+            elif backend == "pool":
+                result = pool.gene_deletion(model_manager.current_model_id, model, deletion_sets(valid_genes, type),
+                                            deadline.at)
+            else:
+                target = model_manager.policy.model_for(model_manager.current_model_id, model, backend)
+                result = deletion_with_deadline(target, [target.genes.get_by_id(g.id) for g in valid_genes],
+                                                "gene", type, deadline)
+            info["lp_count"] = 0 if precomputed is not None else len(result) + 1
+        solver = report(backend, deadline, (result["status"] == "time_limit").sum())
 
         result = result.rename(columns={
             "growth": "Post-KO Growth",
@@ -279,36 +393,76 @@ def gene_knockout_simulation(gene_names: list[str], type: str = "single") -> dic
 
         if len(result) > 5:
             file_path = os.path.join(os.getcwd(), "outputs/knockouts/gene_knockout_result.csv")
-            result.to_csv(file_path, index=False)
+            write_csv(result, file_path)
             subset = result.iloc[:5, :5]
-            return {"file": file_path, "data": subset.to_dict(orient="records"), "note": "Too many results to display. Download CSV."}
+            return {"file": file_path, "data": subset.to_dict(orient="records"), "note": "Too many results to display. Download CSV.",
+                    "solver": solver}
 
-        return result.to_dict(orient="records")
+        return {"data": result.to_dict(orient="records"), "solver": solver}
 
     except Exception as e:
         return {"error": str(e)}
-def reaction_knockout_simulation(reaction_names: list[str], type: str = "single") -> dict:
+@tool_events
+@traced("tool")
+def find_essential_genes(threshold: float = 0.01) -> dict:
+    """
+    Lists the genes whose single knockout leaves less than `threshold` of the wild-type growth.
+    """
+    try:
+        model = model_manager.get_current_model()
+        model_id = model_manager.current_model_id
+        table = model_manager.precompute.get("gene_deletion")
+        fba = model_manager.precompute.get("fba")
+        with span("solver", "essential_genes", precomputed=table is not None) as info:
+            reference = fba["objective_value"] if fba else model.slim_optimize(error_value=None)
+            if reference is None:
+                return {"error": "The model is infeasible; no reference growth to compare against."}
+            if table is None:
+                table = gene_deletion_table(model_manager, model_id, [g.id for g in model.genes])
+            info["lp_count"] = (0 if fba else 1) + (0 if info["precomputed"] else len(table))
+        genes = essential_genes(table, reference, threshold)
+        result = {"reference_growth": reference, "essential_count": len(genes), "genes_count": len(table)}
+        if len(genes) > 20:
+            file_path = os.path.join(os.getcwd(), "outputs/knockouts/essential_genes.csv")
+            write_csv(table.loc[genes].reset_index().rename(columns={"ids": "Gene"}), file_path)
+            return {**result, "file": file_path, "essential_genes": genes[:20], "note": "Too many results to display. Download CSV."}
+        return {**result, "essential_genes": genes}
+
+    except Exception as e:
+        return {"error": str(e)}
+@tool_events
+@traced("tool")
+def reaction_knockout_simulation(reaction_names: list[str], type: str = "single", deadline: float = None) -> dict:
     """
     Performs single or double reaction knockout simulations on the loaded metabolic model.
     """
     try:
         model = model_manager.get_current_model()
-        valid_rxns = []
-        seen = set()
-        for rxn in model.reactions:
-            if rxn.name in reaction_names and rxn.id not in seen:
-                valid_rxns.append(rxn)
-                seen.add(rxn.id)
+        valid_rxns = [model.reactions[i] for i in model_manager.get_summary().find("reactions", reaction_names)]
 
         if not valid_rxns:
             return {"error": "None of the provided reactions are valid in this model."}
 
-        if type == "single":
-            result = single_reaction_deletion(model, reaction_list=valid_rxns)
-        elif type == "double":
-            result = double_reaction_deletion(model, reaction_list=valid_rxns)
-        else:
+        if type not in ("single", "double"):
             return {"error": "Invalid type. Choose 'single' or 'double'."}
+        deadline = Deadline(deadline)
+        pool = model_manager.pool_for(model)
+        backend = model_manager.policy.choose("knockout", model)
+        with span("solver", f"{type}_reaction_deletion", backend=backend) as info:
+            compressed = model_manager.get_compressed() if backend == "pool" else None
+            if compressed:
+                sets = deletion_sets(valid_rxns, type)
+                result = pool.deletion_table(compressed.key, compressed.model, [{r.id for r in rxns} for rxns in sets],
+                                             compressed.reaction_knockouts(sets), deadline.at)
+            elif backend == "pool":
+                result = pool.reaction_deletion(model_manager.current_model_id, model, deletion_sets(valid_rxns, type),
+                                                deadline.at)
+            else:
+                target = model_manager.policy.model_for(model_manager.current_model_id, model, backend)
+                result = deletion_with_deadline(target, [target.reactions.get_by_id(r.id) for r in valid_rxns],
+                                                "reaction", type, deadline)
+            info["lp_count"] = len(result) + 1
+        solver = report(backend, deadline, (result["status"] == "time_limit").sum())
 
         result = result.rename(columns={
             "growth": "Post-KO Growth",
@@ -318,11 +472,41 @@ def reaction_knockout_simulation(reaction_names: list[str], type: str = "single"
 
         if len(result) > 5:
             file_path = os.path.join(os.getcwd(), "outputs/knockouts/reaction_knockout_result.csv")
-            result.to_csv(file_path, index=False)
+            write_csv(result, file_path)
             subset = result.iloc[:5, :5]
-            return {"file": file_path, "data": subset.to_dict(orient="records"), "note": "Too many results to display. Download CSV."}
+            return {"file": file_path, "data": subset.to_dict(orient="records"), "note": "Too many results to display. Download CSV.",
+                    "solver": solver}
+
+        return {"data": result.to_dict(orient="records"), "solver": solver}
 
-        return result.to_dict(orient="records")
+    except Exception as e:
+        return {"error": str(e)}
+@tool_events
+@traced("tool")
+def reaction_deletion_screen(subsystem: str = None, threshold: float = 0.01, deadline: float = None) -> dict:
+    """
+    Knocks out every reaction (or every reaction of one subsystem) one at a time and ranks them by the growth left.
+    """
+    try:
+        model = model_manager.get_current_model()
+        model_id = model_manager.current_model_id
+        summary = model_manager.get_summary()
+        if subsystem:
+            positions = summary.in_subsystem(subsystem)
+            if not len(positions):
+                subsystems = sorted({s for s in summary.subsystems if s})
+                return {"error": f"No reactions in subsystem '{subsystem}'.", "subsystems": subsystems[:50]}
+        else:
+            positions = np.arange(len(summary.ids["reactions"]))
+        deadline = Deadline(deadline)
+        backend = model_manager.policy.choose("knockout", model)
+        target = None if backend == "pool" else model_manager.policy.model_for(model_id, model, backend)
+        with span("solver", "reaction_deletion_screen", backend=backend, reactions=len(positions)) as info:
+            table, result = screen_reactions(model_manager, model_id, positions, deadline, backend, target, threshold)
+            info["lp_count"] = result["lps"] + 1
+        file_path = os.path.join(os.getcwd(), "outputs/knockouts/reaction_deletion_screen.csv")
+        write_csv(table, file_path)
+        return {"file": file_path, **result, "solver": report(backend, deadline, result["unfinished"])}
 
     except Exception as e:
         return {"error": str(e)}
@@ -357,21 +541,96 @@ def recommend_sampling_config(model):
         "thinning": thinning,
         "processes": processes
     }
+@tool_events
+@traced("tool")
+def parametric_sweep(reaction_ids: list[str], start: list[float], stop: list[float], steps: int = 21,
+                     bound: str = "lower", target_reaction: str = None, deadline: float = None) -> dict:
+    """
+    Sweeps the bounds of one or two reactions over a grid and solves the model at every point.
+    """
+    try:
+        model = model_manager.get_current_model()
+        if not 1 <= len(reaction_ids) <= 2 or len(set(reaction_ids)) != len(reaction_ids):
+            return {"error": "Give one or two different reactions to sweep."}
+        if len(start) != len(reaction_ids) or len(stop) != len(reaction_ids):
+            return {"error": "Give one start and one stop value per reaction."}
+        if bound not in BOUNDS:
+            return {"error": f"Invalid bound. Choose one of {', '.join(BOUNDS)}."}
+        for rxn_id in reaction_ids + ([target_reaction] if target_reaction else []):
+            if rxn_id not in model.reactions:
+                return {"error": f"Reaction '{rxn_id}' not found in model."}
+        if target_reaction is None and not model_manager.objective:
+            return {"error": "No Objective Function is set for the model."}
+
+        parameters = [(rxn_id, bound) for rxn_id in reaction_ids]
+        axes = grid_axes(start, stop, steps)
+        channels, objectives = sweep_channels(model, target_reaction)
+        deadline = Deadline(deadline)
+        pool = model_manager.pool_for(model)
+        backend = "pool" if pool else interface_name(model)
+        points = int(np.prod([len(a) for a in axes]))
+        with span("solver", "sweep", lp_count=points * len(channels), backend=backend, points=points):
+            if pool:
+                surface, unfinished = pool.sweep(model_manager.current_model_id, model, parameters, axes, objectives,
+                                                 deadline.at)
+            else:
+                model_id = model_manager.current_model_id
+                target, lock = private_copy(model_id, model, model_manager.get_revision(model_id))
+                surface, unfinished = sweep_cobra(target, parameters, axes, deadline, target_reaction, lock)
+        path = save_surface(surface, parameters, axes, channels, target_reaction)
+        return {"file": path, **preview(surface, parameters, axes, channels, unfinished),
+                "solver": report(backend, deadline, unfinished)}
+
+    except Exception as e:
+        return {"error": str(e)}
+@tool_events
+@traced("tool")
+def screen_models(directory: str = None, analysis: str = "fba", threshold: float = 0.01) -> dict:
+    """
+    Runs FBA or gene/reaction essentiality on every SBML model of a directory (default: the local
+    model library) under the uploaded media bounds.
+    """
+    try:
+        directory = check_directory(directory or model_manager.library.models_dir,
+                                    (model_manager.library.root, UPLOAD_DIR))
+        if analysis not in ANALYSES:
+            return {"error": f"Invalid analysis. Choose one of {', '.join(ANALYSES)}."}
+        with span("solver", "screen", analysis=analysis) as info:
+            summary = run_screen(directory, analysis, model_manager.bounds_data, threshold=threshold)
+            info["models"] = summary["models"]
+        if not summary["models"]:
+            return {"error": f"No SBML models found in '{directory}'."}
+        if len(summary["results"]) > 10:
+            summary["note"] = f"First 10 of {len(summary['results'])} models shown. Download CSV."
+            summary["results"] = summary["results"][:10]
+        return summary
+
+    except Exception as e:
+        return {"error": str(e)}
+@tool_events
+@traced("tool")
 def sample_metabolic_model(reaction_count=1000):
     """
     Samples a metabolic model given the number of samples.
     """
     model = model_manager.get_current_model()
     # error handling
-    config = recommend_sampling_config(model)
-    if config["method"] == "achr":
-        sampler = ACHRSampler(model, thinning=config["thinning"])
-    else:
-        sampler = OptGPSampler(model, thinning=config["thinning"], processes=config["processes"])
-    samples = sampler.sample(reaction_count)
+    compressed = model_manager.get_compressed()
+    # the reduced model has fewer dimensions to sample; samples are mapped back to every reaction
+    target = compressed.model if compressed else model
+    config = recommend_sampling_config(target)
+    with span("solver", "sampling_warmup", lp_count=2 * len(target.reactions)):
+        if config["method"] == "achr":
+            sampler = ACHRSampler(target, thinning=config["thinning"])
+        else:
+            sampler = OptGPSampler(target, thinning=config["thinning"], processes=config["processes"])
+    with span("solver", "sampling", method=config["method"]):
+        samples = sampler.sample(reaction_count)
+    if compressed:
+        samples = compressed.expand_samples(samples, [rxn.id for rxn in model.reactions])
     subset = samples.iloc[:5, :5]
     output_dir = os.path.join(os.getcwd(), 'outputs/flux_sampling', 'flux_sampling_result.csv')
-    samples.to_csv(output_dir, index=False)
+    write_csv(samples, output_dir)
     return {
         "status": "success",
         "n_samples": reaction_count,
@@ -404,6 +663,12 @@ load_model_tool = FunctionTool.from_defaults(
     fn_schema=LoadModelInput,
     return_direct=return_direct
 )
+search_library_tool = FunctionTool.from_defaults(
+    fn=search_model_library,
+    name="search_model_library",
+    description="Searches the local model library by model ID, name or organism and returns matching models with their sizes.",
+    return_direct=return_direct
+)
 model_data_tool = FunctionTool.from_defaults(
     fn=model_data,
     name="model_data",
@@ -415,7 +680,7 @@ model_info_tool = FunctionTool.from_defaults(
     name="model_info",
     description="""Returns categorical data for a given model based on a query.
     Queries can be 'reactions', 'genes', or 'metabolites'.
-    You can also specify the number of items to return with the 'count' parameter.""",
+    You can also specify the number of items to return with the 'count' parameter and where to start with 'offset'.""",
     return_direct=return_direct
 )
 reaction_info_tool = FunctionTool.from_defaults(
@@ -443,6 +708,12 @@ run_fba_tool = FunctionTool.from_defaults(
     description="Uses a bounds dictionary loaded using `set_reaction_bounds_for_FBA()` for Flux Balance Analysis (FBA).",
     return_direct=return_direct
 )
+flux_diff_tool = FunctionTool.from_defaults(
+    fn=compare_flux_runs,
+    name="compare_flux_runs",
+    description="Compares two stored FBA runs (run ids from run_flux_balance_analysis; default: the last two) and lists the top_k reactions whose flux changed most",
+    return_direct=return_direct
+)
 set_objective_tool = FunctionTool.from_defaults(
     fn=set_model_objective,
     name="set_model_objective_value",
@@ -467,6 +738,30 @@ reaction_knockout_tool = FunctionTool.from_defaults(
     description="Performs single or double reaction knockout simulations on the loaded metabolic model",
     return_direct=return_direct
 )
+essential_genes_tool = FunctionTool.from_defaults(
+    fn=find_essential_genes,
+    name="find_essential_genes",
+    description="Lists the essential genes of the loaded model: genes whose single knockout drops growth below a fraction (threshold) of the wild-type growth",
+    return_direct=return_direct
+)
+sweep_tool = FunctionTool.from_defaults(
+    fn=parametric_sweep,
+    name="parametric_sweep",
+    description="Sweeps the lower (or upper, or fixed) bound of one or two reactions from start to stop values in a number of steps and solves the model at every grid point: robustness analysis (1 reaction), phenotype phase planes (2 reactions), or a production envelope of a target reaction",
+    return_direct=return_direct
+)
+screen_tool = FunctionTool.from_defaults(
+    fn=screen_models,
+    name="screen_models",
+    description="Screens many models at once: runs FBA, gene essentiality or reaction essentiality (analysis='fba', 'gene_essentiality', 'reaction_essentiality') on every SBML model of a directory (default: the local model library) under the uploaded media bounds, and saves one CSV table",
+    return_direct=return_direct
+)
+deletion_screen_tool = FunctionTool.from_defaults(
+    fn=reaction_deletion_screen,
+    name="reaction_deletion_screen",
+    description="Screens reaction essentiality: knocks out every reaction of the model (or of one subsystem) one at a time, ranks them by remaining growth and saves the full table as CSV",
+    return_direct=return_direct
+)
 flux_sampler_tool = FunctionTool.from_defaults(
     fn=sample_metabolic_model,
     name="sample_metabolic_model",